@@ -0,0 +1,171 @@
+import numpy as np
+from simulation import GameSimulator
+from observation import ObservationRenderer
+
+# N independent games stepped in lockstep for training and evaluating bots.
+# Actions are per-game input bitmasks (INPUT_* bits); observations are
+# fixed-shape arrays so a whole batch can go straight into numpy code:
+#   player, enemy    (N, 2)     centers
+#   projectiles      (N, K, 4)  x, y, dx, dy of the K projectiles nearest the player
+#   projectile_mask  (N, K)     which projectile rows are real
+#   powerups         (N, M, 3)  center x, center y, type index
+#   powerup_mask     (N, M)
+#   grid             (N, C, H, W)  occupancy grids (observation.py), only
+#                                  when grid_scale is set
+# The reward is the score gained by the step. A finished game (hit, or
+# max_frames reached) is reset straight away, like main.reset_game, with
+# the next seed in its own sequence.
+
+class BatchEnv:
+    def __init__(self, num_envs, seed=0, aggressiveness=1.0, player_speed=5, max_frames=None,
+                 max_projectiles=32, max_powerups=4, grid_scale=None):
+        self.num_envs = num_envs
+        self.base_seed = seed
+        self.aggressiveness = aggressiveness
+        self.player_speed = player_speed
+        self.max_frames = max_frames
+        self.max_projectiles = max_projectiles
+        self.max_powerups = max_powerups
+        self.sims = [GameSimulator(aggressiveness=aggressiveness, player_speed=player_speed) for _ in range(num_envs)]
+        self.seeds = np.zeros(num_envs, dtype=np.int64)
+        self.episodes = np.zeros(num_envs, dtype=np.int64)
+        self.last_scores = np.zeros(num_envs, dtype=np.int64)
+
+        self.player = np.zeros((num_envs, 2), dtype=np.float32)
+        self.enemy = np.zeros((num_envs, 2), dtype=np.float32)
+        self.projectiles = np.zeros((num_envs, max_projectiles, 4), dtype=np.float32)
+        self.projectile_mask = np.zeros((num_envs, max_projectiles), dtype=bool)
+        self.powerups = np.zeros((num_envs, max_powerups, 3), dtype=np.float32)
+        self.powerup_mask = np.zeros((num_envs, max_powerups), dtype=bool)
+        self.renderer = None
+        if grid_scale:
+            self.renderer = ObservationRenderer(grid_scale)
+            self.grid = self.renderer.buffer(num_envs)
+
+    def _seed_for(self, i):
+        # Game i plays seeds base + i, base + i + N, base + i + 2N, ...
+        return self.base_seed + i + self.episodes[i] * self.num_envs
+
+    def _reset_one(self, i):
+        sim = self.sims[i]
+        seed = int(self._seed_for(i))
+        sim.set_settings(self.aggressiveness, self.player_speed)
+        sim.reset(seed=seed)
+        self.seeds[i] = seed
+        self.last_scores[i] = sim.score
+
+    def reset(self):
+        self.episodes[:] = 0
+        for i in range(self.num_envs):
+            self._reset_one(i)
+        for i in range(self.num_envs):
+            self._observe(i)
+        return self.observation()
+
+    def step(self, actions):
+        # Returns (observation, rewards, dones, infos); infos holds one dict
+        # per game that finished this step, taken before its reset
+        actions = np.asarray(actions, dtype=np.int64).tolist()
+        if len(actions) != self.num_envs:
+            raise ValueError(f"expected {self.num_envs} actions, got {len(actions)}")
+        rewards = np.zeros(self.num_envs, dtype=np.float32)
+        dones = np.zeros(self.num_envs, dtype=bool)
+        infos = []
+        max_frames = self.max_frames
+        for i, (sim, inputs) in enumerate(zip(self.sims, actions)):
+            sim.step(inputs)
+            rewards[i] = sim.score - self.last_scores[i]
+            self.last_scores[i] = sim.score
+            truncated = max_frames is not None and sim.frame >= max_frames
+            if sim.game_over or truncated:
+                dones[i] = True
+                infos.append({'env': i, 'seed': int(self.seeds[i]), 'score': sim.score, 'frames': sim.frame,
+                              'hits_avoided': sim.hits_avoided, 'truncated': not sim.game_over})
+                self.episodes[i] += 1
+                self._reset_one(i)
+            self._observe(i)
+        return self.observation(), rewards, dones, infos
+
+    def _observe(self, i):
+        sim = self.sims[i]
+        px, py = sim.player.center
+        self.player[i] = px, py
+        self.enemy[i] = sim.enemy.center
+
+        store = sim.projectiles
+        n = store.count
+        k = min(n, self.max_projectiles)
+        self.projectile_mask[i] = False
+        if k:
+            cx, cy = store.centers()
+            if n > k:
+                d2 = (cx - px) ** 2 + (cy - py) ** 2
+                nearest = np.argpartition(d2, k - 1)[:k]
+            else:
+                nearest = slice(0, n)
+            rows = self.projectiles[i, :k]
+            rows[:, 0] = cx[nearest]
+            rows[:, 1] = cy[nearest]
+            rows[:, 2] = store.dx[:n][nearest]
+            rows[:, 3] = store.dy[:n][nearest]
+            self.projectile_mask[i, :k] = True
+        self.projectiles[i, k:] = 0
+
+        powerups = sim.powerups
+        m = min(len(powerups), self.max_powerups)
+        self.powerup_mask[i] = False
+        if m:
+            cx, cy = sim.powerup_centers()
+            self.powerups[i, :m, 0] = cx[:m]
+            self.powerups[i, :m, 1] = cy[:m]
+            self.powerups[i, :m, 2] = powerups.kind[:m]
+            self.powerup_mask[i, :m] = True
+        self.powerups[i, m:] = 0
+
+        if self.renderer is not None:
+            self.renderer.render(sim, self.grid[i])
+
+    def observation(self):
+        # Copies, so callers can keep them across steps
+        obs = {
+            'player': self.player.copy(),
+            'enemy': self.enemy.copy(),
+            'projectiles': self.projectiles.copy(),
+            'projectile_mask': self.projectile_mask.copy(),
+            'powerups': self.powerups.copy(),
+            'powerup_mask': self.powerup_mask.copy(),
+        }
+        if self.renderer is not None:
+            obs['grid'] = self.grid.copy()
+        return obs
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    from bots import make_policy, POLICIES
+
+    parser = argparse.ArgumentParser(description="Step N headless games in lockstep with a scripted bot")
+    parser.add_argument("--envs", type=int, default=64)
+    parser.add_argument("--steps", type=int, default=2000)
+    parser.add_argument("--bot", choices=sorted(POLICIES), default="dodge")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-frames", type=int, default=None)
+    parser.add_argument("--grid-scale", type=int, default=None, help="also rasterize occupancy grids at this scale")
+    args = parser.parse_args()
+
+    env = BatchEnv(args.envs, seed=args.seed, max_frames=args.max_frames, grid_scale=args.grid_scale)
+    policies = [make_policy(args.bot, args.seed + i) for i in range(args.envs)]
+    env.reset()
+    finished = []
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        actions = [policy(sim) for policy, sim in zip(policies, env.sims)]
+        _, _, _, infos = env.step(actions)
+        finished.extend(infos)
+    elapsed = time.perf_counter() - start
+
+    total = args.envs * args.steps
+    print(f"{total} game steps in {elapsed:.2f}s ({total / elapsed:.0f} steps/s), {len(finished)} episodes finished")
+    if finished:
+        print(f"mean score {np.mean([info['score'] for info in finished]):.0f}, "
+              f"mean survival {np.mean([info['frames'] for info in finished]):.0f} frames")
@@ -0,0 +1,263 @@
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+import numpy as np
+import pygame
+import rendering
+from simulation import GameSimulator, SpecialEvent, PowerUpType, WIDTH, HEIGHT
+from bots import DodgePolicy
+from bullet_hell import BulletHellDirector
+from text_cache import TextCache
+from surface_cache import SurfaceCache
+
+# Named, seeded scenarios built on the real game mechanics. Each frame is
+# timed in two parts: simulation step and drawing to an offscreen surface.
+# The player is made invulnerable so every scenario runs its full length.
+
+class Scenario:
+    def __init__(self, name, setup=None, per_frame=None, draw=None, step=True):
+        self.name = name
+        self.setup = setup
+        self.per_frame = per_frame
+        self.draw = draw or rendering.draw_game
+        self.step = step
+
+def quiet_events(sim):
+    # Keep scheduled special events from changing the workload
+    sim.next_special_event_score = 10**9
+
+def setup_late_game(sim):
+    quiet_events(sim)
+    sim.score = 6000
+    sim.hits_avoided = 3000
+
+def setup_rain_of_fire(sim):
+    quiet_events(sim)
+    sim.score = 3000
+    sim.hits_avoided = 1500
+
+def rain_of_fire_frame(sim, frame):
+    # A fresh burst (30 projectiles + 100 particles) every two seconds
+    if frame % 120 == 0:
+        sim.spawn_special_event(SpecialEvent.RAIN_OF_FIRE)
+
+def setup_black_hole(sim):
+    quiet_events(sim)
+    sim.score = 3000
+    sim.special_event_duration = 10**9
+    sim.spawn_special_event(SpecialEvent.MOVING_BLACK_HOLE)
+    sim.gravity.clear()
+    sim.gravity.add(WIDTH / 2, HEIGHT / 2)
+
+def setup_gravity_wells(sim):
+    # Four stationary wells spread over the field
+    setup_black_hole(sim)
+    sim.gravity.clear()
+    for x, y in ((300, 200), (700, 200), (700, 500), (300, 500)):
+        sim.gravity.add(x, y)
+
+def fill_projectile_field(sim, target=400):
+    missing = target - sim.projectiles.count
+    if missing > 0:
+        rng = sim.particles.rng
+        sim.projectiles.add_many(rng.uniform(0, WIDTH, missing), rng.uniform(0, HEIGHT, missing),
+                                 rng.uniform(-2, 2, missing), rng.uniform(-2, 2, missing))
+
+def black_hole_frame(sim, frame):
+    fill_projectile_field(sim)
+
+def setup_stacked_powerups(sim):
+    quiet_events(sim)
+    sim.score = 3000
+    for _ in range(40):
+        sim.spawn_powerup()
+    shield = sim.spawn_powerup(PowerUpType.SHIELD)
+    sim.activate_powerup(shield)
+    sim.powerups.remove(shield)
+
+def stacked_powerups_frame(sim, frame):
+    while len(sim.powerups) < 40:
+        sim.spawn_powerup()
+
+def setup_bullet_hell(sim):
+    quiet_events(sim)
+    sim.spawn_director = BulletHellDirector(10000, seed=1)
+
+SCENARIOS = {
+    'idle_menu': Scenario('idle_menu', draw=rendering.draw_main_menu, step=False),
+    'late_game': Scenario('late_game', setup_late_game),
+    'rain_of_fire': Scenario('rain_of_fire', setup_rain_of_fire, rain_of_fire_frame),
+    'black_hole_field': Scenario('black_hole_field', setup_black_hole, black_hole_frame),
+    'gravity_wells': Scenario('gravity_wells', setup_gravity_wells, black_hole_frame),
+    'stacked_powerups': Scenario('stacked_powerups', setup_stacked_powerups, stacked_powerups_frame),
+    'bullet_hell': Scenario('bullet_hell', setup_bullet_hell),
+}
+
+def summarize_times(samples_ns):
+    ms = np.asarray(samples_ns, dtype=np.float64) / 1e6
+    return {
+        'mean': round(float(ms.mean()), 4),
+        'p95': round(float(np.percentile(ms, 95)), 4),
+        'p99': round(float(np.percentile(ms, 99)), 4),
+        'max': round(float(ms.max()), 4),
+    }
+
+def run_frame(scenario, sim, policy, frame):
+    if scenario.per_frame:
+        scenario.per_frame(sim, frame)
+    t0 = time.perf_counter_ns()
+    if scenario.step:
+        sim.step(policy(sim))
+    t1 = time.perf_counter_ns()
+    scenario.draw()
+    t2 = time.perf_counter_ns()
+    return t1 - t0, t2 - t1
+
+def run_scenario(scenario, frames=600, warmup=60, seed=1234, alloc_frames=120):
+    surface = pygame.Surface((WIDTH, HEIGHT))
+    sim = GameSimulator(seed=seed)
+    # Scenarios measure the named situation, not repeated death explosions
+    sim.invulnerable = True
+    rendering.init(surface, sim)
+    rendering.blink_rng.seed(seed)
+    rendering.text_cache = TextCache()
+    rendering.surface_cache = SurfaceCache()
+    if scenario.setup:
+        scenario.setup(sim)
+    policy = DodgePolicy()
+
+    for frame in range(warmup):
+        run_frame(scenario, sim, policy, frame)
+
+    step_ns, draw_ns = [], []
+    gc_before = sum(s['collections'] for s in gc.get_stats())
+    peak_projectiles = peak_particles = total_projectiles = peak_spawn_queue = 0
+    for frame in range(warmup, warmup + frames):
+        step, draw = run_frame(scenario, sim, policy, frame)
+        step_ns.append(step)
+        draw_ns.append(draw)
+        peak_projectiles = max(peak_projectiles, sim.projectiles.count)
+        total_projectiles += sim.projectiles.count
+        peak_particles = max(peak_particles, sim.particles.count)
+        peak_spawn_queue = max(peak_spawn_queue, sim.spawner.pending)
+    gc_collections = sum(s['collections'] for s in gc.get_stats()) - gc_before
+
+    # Separate pass under tracemalloc, which would distort the timings above.
+    # Each frame reports its transient peak and the blocks it left allocated
+    # (snapshot diff, ignoring tracemalloc's own snapshot objects).
+    tracemalloc.start()
+    ignore_tracemalloc = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    blocks, peaks = [], []
+    start = warmup + frames
+    before = tracemalloc.take_snapshot().filter_traces(ignore_tracemalloc) if alloc_frames else None
+    for frame in range(start, start + alloc_frames):
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        run_frame(scenario, sim, policy, frame)
+        _, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - current)
+        after = tracemalloc.take_snapshot().filter_traces(ignore_tracemalloc)
+        blocks.append(sum(stat.count_diff for stat in after.compare_to(before, 'filename') if stat.count_diff > 0))
+        before = after
+    tracemalloc.stop()
+
+    frame_ns = [s + d for s, d in zip(step_ns, draw_ns)]
+    return {
+        'frames': frames,
+        'step_ms': summarize_times(step_ns),
+        'draw_ms': summarize_times(draw_ns),
+        'frame_ms': summarize_times(frame_ns),
+        'allocations': {
+            'gc_collections': gc_collections,
+            'mean_peak_bytes_per_frame': int(np.mean(peaks)) if peaks else 0,
+            'new_blocks_first_frame': blocks[0] if blocks else 0,
+            'new_blocks_per_frame': {
+                'mean': round(float(np.mean(blocks)), 1) if blocks else 0.0,
+                'p95': round(float(np.percentile(blocks, 95)), 1) if blocks else 0.0,
+            },
+        },
+        'caches': {
+            'text': rendering.text_cache.stats(),
+            'surface': rendering.surface_cache.stats(),
+        },
+        'entities': {
+            'peak_projectiles': peak_projectiles,
+            'mean_projectiles': round(total_projectiles / frames, 1),
+            'peak_particles': peak_particles,
+            'powerups': len(sim.powerups),
+            'peak_spawn_queue': peak_spawn_queue,
+        },
+    }
+
+def run_benchmarks(names=None, frames=600, seed=1234):
+    results = {}
+    for name in names or SCENARIOS:
+        results[name] = run_scenario(SCENARIOS[name], frames=frames, seed=seed)
+    return {
+        'meta': {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'pygame': pygame.version.ver,
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'frames': frames,
+            'seed': seed,
+        },
+        'scenarios': results,
+    }
+
+def compare(current, baseline, threshold=0.2):
+    # Returns (scenario, metric, baseline, current) for every p95 that got slower by more than threshold
+    regressions = []
+    for name, result in current['scenarios'].items():
+        base = baseline['scenarios'].get(name)
+        if not base:
+            continue
+        for metric in ('step_ms', 'draw_ms', 'frame_ms'):
+            old, new = base[metric]['p95'], result[metric]['p95']
+            if old > 0 and new > old * (1 + threshold):
+                regressions.append((name, metric, old, new))
+    return regressions
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run DodgeMaster++ scenario benchmarks")
+    parser.add_argument("scenarios", nargs="*", help=f"any of {', '.join(SCENARIOS)} (default: all)")
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--out", default="data/benchmark.json")
+    parser.add_argument("--compare", metavar="BASELINE", help="fail if any p95 regresses past --threshold")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.display.init()
+    report = run_benchmarks(args.scenarios or None, args.frames, args.seed)
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    with open(args.out, "w") as file:
+        json.dump(report, file, indent=2)
+
+    print(f"{'scenario':<18} {'step mean':>9} {'p95':>7} {'p99':>7} {'draw mean':>9} {'p95':>7} {'p99':>7} "
+          f"{'blocks/frame':>12} {'p95':>5}")
+    for name, result in report['scenarios'].items():
+        step, draw = result['step_ms'], result['draw_ms']
+        blocks = result['allocations']['new_blocks_per_frame']
+        print(f"{name:<18} {step['mean']:>9.3f} {step['p95']:>7.3f} {step['p99']:>7.3f} "
+              f"{draw['mean']:>9.3f} {draw['p95']:>7.3f} {draw['p99']:>7.3f} "
+              f"{blocks['mean']:>12.1f} {blocks['p95']:>5.0f}")
+    print(f"results written to {args.out}")
+
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(report, json.load(file), args.threshold)
+        for name, metric, old, new in regressions:
+            print(f"REGRESSION {name} {metric} p95 {old:.3f} -> {new:.3f} ms")
+        sys.exit(1 if regressions else 0)
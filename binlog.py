@@ -0,0 +1,216 @@
+from datetime import datetime
+import glob
+import os
+import struct
+import numpy as np
+from utils import DATA_DIR, EventLogger
+
+# Binary event log: fixed-width little-endian records in append-only segment
+# files (segment-000000.bin, segment-000001.bin, ...) under one directory.
+# Each segment starts with a 16 byte header (magic, version, record size);
+# the rest is a packed array of RECORD_DTYPE, so a reader maps the file and
+# gets numpy columns without parsing anything.
+LOG_DIR = os.path.join(DATA_DIR, "game_log")
+EVENT_TYPES = ('missed', 'hit', 'powerup', 'special_event')
+EVENT_CODES = {name: code for code, name in enumerate(EVENT_TYPES)}
+RECORD_DTYPE = np.dtype([
+    ('timestamp', '<i8'),  # microseconds since the epoch
+    ('event', 'u1'),       # index into EVENT_TYPES
+    ('x_pos', '<i2'),
+    ('y_pos', '<i2'),
+    ('score', '<i4'),
+])
+MAGIC = b"DMLOG\x00"
+VERSION = 1
+HEADER = struct.Struct("<6sHI4x")
+HEADER_SIZE = HEADER.size
+
+def encode(rows):
+    # (time.time(), event, x_pos, y_pos, score) tuples -> record array
+    records = np.zeros(len(rows), dtype=RECORD_DTYPE)
+    if rows:
+        t, event, x, y, score = zip(*rows)
+        records['timestamp'] = np.round(np.array(t) * 1e6)
+        records['event'] = [EVENT_CODES[name] for name in event]
+        records['x_pos'] = np.clip(x, -32768, 32767)
+        records['y_pos'] = np.clip(y, -32768, 32767)
+        records['score'] = score
+    return records
+
+def segment_paths(directory=LOG_DIR):
+    return sorted(glob.glob(os.path.join(directory, "segment-*.bin")))
+
+def read_segment(path):
+    # Read-only memory map of a segment's records; a torn record left by a
+    # crash mid-write is ignored
+    with open(path, "rb") as file:
+        header = file.read(HEADER_SIZE)
+    if len(header) < HEADER_SIZE:
+        return np.zeros(0, dtype=RECORD_DTYPE)
+    magic, version, itemsize = HEADER.unpack(header)
+    if magic != MAGIC or version != VERSION or itemsize != RECORD_DTYPE.itemsize:
+        raise ValueError(f"{path} is not a version {VERSION} DodgeMaster binary log")
+    count = (os.path.getsize(path) - HEADER_SIZE) // RECORD_DTYPE.itemsize
+    if not count:
+        return np.zeros(0, dtype=RECORD_DTYPE)
+    return np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER_SIZE, shape=(count,))
+
+def iter_segments(directory=LOG_DIR):
+    # A log directory's segments in order, or a single segment file
+    paths = [directory] if os.path.isfile(directory) else segment_paths(directory)
+    for path in paths:
+        records = read_segment(path)
+        if len(records):
+            yield records
+
+def read_log(directory=LOG_DIR):
+    # All records; only a single-segment log comes back without a copy
+    segments = list(iter_segments(directory))
+    if not segments:
+        return np.zeros(0, dtype=RECORD_DTYPE)
+    return segments[0] if len(segments) == 1 else np.concatenate(segments)
+
+def event_names(codes):
+    # Event codes as a pandas Categorical, without building strings per row
+    import pandas as pd
+    return pd.Categorical.from_codes(codes, EVENT_TYPES)
+
+def to_frame(records):
+    # The CSV log's columns, with timestamps as UTC datetimes
+    import pandas as pd
+    return pd.DataFrame({
+        'timestamp': pd.to_datetime(records['timestamp'], unit='us'),
+        'event': event_names(records['event']),
+        'x_pos': records['x_pos'],
+        'y_pos': records['y_pos'],
+        'score': records['score'],
+    })
+
+def is_binary_log(path):
+    return os.path.isdir(path) or path.endswith(".bin")
+
+class SegmentWriter:
+    # Appends records to the newest segment, starting a new one every
+    # segment_records records
+    def __init__(self, directory=LOG_DIR, segment_records=1 << 20):
+        self.directory = directory
+        self.segment_records = segment_records
+        os.makedirs(directory, exist_ok=True)
+        self.file = None
+        self.records = 0
+        paths = segment_paths(directory)
+        if paths:
+            self.index = int(os.path.basename(paths[-1])[len("segment-"):-len(".bin")])
+            self._open(paths[-1])
+        else:
+            self._start(0)
+
+    def _path(self, index):
+        return os.path.join(self.directory, f"segment-{index:06d}.bin")
+
+    def _open(self, path):
+        size = os.path.getsize(path)
+        if size < HEADER_SIZE:
+            self._start(self.index)
+            return
+        records = (size - HEADER_SIZE) // RECORD_DTYPE.itemsize
+        self.file = open(path, "r+b")
+        # Drop a torn record so appends stay aligned
+        self.file.truncate(HEADER_SIZE + records * RECORD_DTYPE.itemsize)
+        self.file.seek(0, os.SEEK_END)
+        self.records = records
+        if records >= self.segment_records:
+            self._start(self.index + 1)
+
+    def _start(self, index):
+        if self.file:
+            self.file.close()
+        self.index = index
+        self.file = open(self._path(index), "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, RECORD_DTYPE.itemsize))
+        self.records = 0
+
+    def write(self, records):
+        while len(records):
+            room = self.segment_records - self.records
+            if room <= 0:
+                self._start(self.index + 1)
+                continue
+            part, records = records[:room], records[room:]
+            self.file.write(part.tobytes())
+            self.records += len(part)
+        self.file.flush()
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+class BinaryEventLogger(EventLogger):
+    # EventLogger writing binary segments instead of CSV; segments take the
+    # place of size-based rotation
+    def __init__(self, path=LOG_DIR, segment_records=1 << 20, **options):
+        self.writer = SegmentWriter(path, segment_records)
+        super().__init__(path=path, **options)
+
+    def log(self, event, x_pos, y_pos, score):
+        # Rejected here, on the caller's thread, rather than at flush
+        if event not in EVENT_CODES:
+            raise ValueError(f"unknown event type {event!r}; binary logs record {', '.join(EVENT_TYPES)}")
+        super().log(event, x_pos, y_pos, score)
+
+    def _write(self, batch):
+        self.writer.write(encode(batch))
+
+    def close(self):
+        super().close()
+        self.writer.close()
+
+def convert_csv(csv_path, directory=LOG_DIR, chunksize=1_000_000):
+    # Imports a CSV game log (or rotated segment) into binary segments
+    import pandas as pd
+    writer = SegmentWriter(directory)
+    rows = 0
+    try:
+        for chunk in pd.read_csv(csv_path, chunksize=chunksize,
+                                 dtype={'event': 'str', 'x_pos': 'int64', 'y_pos': 'int64', 'score': 'int64'}):
+            unknown = set(chunk['event'].unique()) - set(EVENT_CODES)
+            if unknown:
+                raise ValueError(f"unknown event types in {csv_path}: {sorted(unknown)}")
+            records = np.zeros(len(chunk), dtype=RECORD_DTYPE)
+            # The CSV holds naive local times (EventLogger's isoformat)
+            records['timestamp'] = [round(datetime.fromisoformat(t).timestamp() * 1e6) for t in chunk['timestamp']]
+            records['event'] = chunk['event'].map(EVENT_CODES).to_numpy()
+            records['x_pos'] = np.clip(chunk['x_pos'].to_numpy(), -32768, 32767)
+            records['y_pos'] = np.clip(chunk['y_pos'].to_numpy(), -32768, 32767)
+            records['score'] = chunk['score'].to_numpy()
+            writer.write(records)
+            rows += len(records)
+    finally:
+        writer.close()
+    return rows
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert and inspect binary game logs")
+    sub = parser.add_subparsers(dest="command", required=True)
+    convert = sub.add_parser("convert", help="import CSV logs into binary segments")
+    convert.add_argument("csv_paths", nargs="+")
+    convert.add_argument("--out", default=LOG_DIR)
+    convert.add_argument("--chunksize", type=int, default=1_000_000)
+    show = sub.add_parser("show", help="print a binary log's size and first records")
+    show.add_argument("directory", nargs="?", default=LOG_DIR)
+    show.add_argument("--head", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        for csv_path in args.csv_paths:
+            rows = convert_csv(csv_path, args.out, args.chunksize)
+            print(f"{csv_path}: {rows} records -> {args.out}")
+    else:
+        records = read_log(args.directory)
+        print(f"{len(records)} records in {len(segment_paths(args.directory))} segments "
+              f"({RECORD_DTYPE.itemsize} bytes each)")
+        if len(records):
+            print(to_frame(records[:args.head]).to_string(index=False))
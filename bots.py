@@ -0,0 +1,87 @@
+import random
+import numpy as np
+from simulation import WIDTH, HEIGHT, INPUT_LEFT, INPUT_RIGHT, INPUT_UP, INPUT_DOWN
+
+# Scripted players for headless runs. A policy is called once per frame with
+# the simulator and returns the input bitmask for GameSimulator.step.
+
+def idle_policy(sim):
+    return 0
+
+class RandomPolicy:
+    # Holds a random direction for a few frames at a time
+    def __init__(self, seed=None, hold=20):
+        self.rng = random.Random(seed)
+        self.hold = hold
+        self.inputs = 0
+        self.frames_left = 0
+
+    def __call__(self, sim):
+        if self.frames_left <= 0:
+            self.inputs = self.rng.randrange(16)
+            self.frames_left = self.hold
+        self.frames_left -= 1
+        return self.inputs
+
+def forces_to_inputs(fx, fy, dead_zone=0.05):
+    inputs = 0
+    if fx > dead_zone:
+        inputs |= INPUT_RIGHT
+    elif fx < -dead_zone:
+        inputs |= INPUT_LEFT
+    if fy > dead_zone:
+        inputs |= INPUT_DOWN
+    elif fy < -dead_zone:
+        inputs |= INPUT_UP
+    return inputs
+
+class DodgePolicy:
+    # Potential-field bot: pushed away from the enemy, from where nearby
+    # projectiles are now and where they will be shortly, and from the walls,
+    # with a weak pull back toward the middle so it does not get cornered
+    def __init__(self, lookahead=(0, 6, 12), danger_radius=120, enemy_weight=1.0, wall_weight=30.0, center_weight=0.5):
+        self.lookahead = lookahead
+        self.danger_radius = danger_radius
+        self.enemy_weight = enemy_weight
+        self.wall_weight = wall_weight
+        self.center_weight = center_weight
+
+    def __call__(self, sim):
+        px, py = sim.player.center
+        dx, dy = px - sim.enemy.centerx, py - sim.enemy.centery
+        dist = max(1.0, (dx*dx + dy*dy) ** 0.5)
+        fx = dx / dist * self.enemy_weight * 100 / dist
+        fy = dy / dist * self.enemy_weight * 100 / dist
+
+        projectiles = sim.projectiles
+        if projectiles.count:
+            n = projectiles.count
+            cx, cy = projectiles.centers()
+            vx, vy = projectiles.dx[:n], projectiles.dy[:n]
+            limit = self.danger_radius * self.danger_radius
+            for ahead in self.lookahead:
+                rx = px - (cx + vx * ahead)
+                ry = py - (cy + vy * ahead)
+                d2 = np.maximum(rx*rx + ry*ry, 1.0)
+                near = d2 < limit
+                if near.any():
+                    weight = 100 / d2[near]
+                    fx += float((rx[near] * weight).sum()) / 10
+                    fy += float((ry[near] * weight).sum()) / 10
+
+        fx += self.center_weight * (WIDTH / 2 - px) / WIDTH
+        fy += self.center_weight * (HEIGHT / 2 - py) / HEIGHT
+        fx += self.wall_weight * (1 / max(px, 1) - 1 / max(WIDTH - px, 1))
+        fy += self.wall_weight * (1 / max(py, 1) - 1 / max(HEIGHT - py, 1))
+        return forces_to_inputs(fx, fy)
+
+POLICIES = {
+    'idle': lambda seed: idle_policy,
+    'random': lambda seed: RandomPolicy(seed),
+    'dodge': lambda seed: DodgePolicy(),
+}
+
+def make_policy(name, seed=None):
+    if name not in POLICIES:
+        raise ValueError(f"unknown bot {name!r}, expected one of {sorted(POLICIES)}")
+    return POLICIES[name](seed)
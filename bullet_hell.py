@@ -0,0 +1,94 @@
+import math
+import numpy as np
+
+# Stress mode: a director attached to GameSimulator.spawn_director keeps the
+# live projectile count near a target by firing patterns every step. Rings and
+# spirals come from the enemy; aimed volleys come from the screen edges using
+# the same side choice and aim point as GameSimulator.spawn_projectile.
+
+def ring(cx, cy, count, speed, phase=0.0):
+    angle = phase + np.arange(count) * (2 * math.pi / count)
+    return np.full(count, float(cx)), np.full(count, float(cy)), np.cos(angle) * speed, np.sin(angle) * speed
+
+def spiral(cx, cy, arms, speed, angle):
+    # One burst of a rotating spiral; call with an advancing angle each step
+    return ring(cx, cy, arms, speed, angle)
+
+def volley(x, y, target_x, target_y, count, speed, spread):
+    # A fan of `count` projectiles centered on the aim point
+    aim = math.atan2(target_y - y, target_x - x)
+    angle = aim + np.linspace(-spread / 2, spread / 2, count)
+    return np.full(count, float(x)), np.full(count, float(y)), np.cos(angle) * speed, np.sin(angle) * speed
+
+class BulletHellDirector:
+    def __init__(self, target=10000, max_per_step=400, seed=None, spiral_arms=6, spiral_spin=0.17):
+        self.target = target
+        self.max_per_step = max_per_step
+        self.spiral_arms = spiral_arms
+        self.spiral_spin = spiral_spin
+        self.rng = np.random.default_rng(seed)
+        self.spiral_angle = 0.0
+        self.fired = 0
+
+    def fire(self, sim, pattern):
+        x, y, dx, dy = pattern
+        sim.projectiles.add_many(x, y, dx, dy)
+        self.fired += len(x)
+        return len(x)
+
+    def update(self, sim):
+        rng = self.rng
+        budget = min(self.max_per_step, self.target - sim.projectiles.count)
+        if budget <= 0:
+            return
+        scale = (1 + sim.ai_controller.aggressiveness) * sim.time_warp_factor
+        cx, cy = sim.enemy.center
+
+        # The spiral keeps turning every step
+        self.spiral_angle += self.spiral_spin
+        budget -= self.fire(sim, spiral(cx, cy, self.spiral_arms, 2.0 * scale, self.spiral_angle))
+
+        while budget > 0:
+            if rng.random() < 0.5:
+                count = min(budget, int(rng.integers(48, 97)))
+                pattern = ring(cx, cy, count, rng.uniform(1.0, 2.5) * scale, rng.uniform(0, 2 * math.pi))
+            else:
+                count = min(budget, int(rng.integers(12, 25)))
+                x, y = sim.edge_point()
+                target_x, target_y = sim.aim_target()
+                pattern = volley(x, y, target_x, target_y, count, rng.uniform(2.0, 5.0) * scale, rng.uniform(0.3, 1.2))
+            budget -= self.fire(sim, pattern)
+
+if __name__ == "__main__":
+    import argparse
+    import os
+    import pygame
+    from benchmark import Scenario, run_scenario, quiet_events
+    from profiler import FRAME_BUDGET_MS
+
+    parser = argparse.ArgumentParser(description="Find how many projectiles the game sustains at 60 fps")
+    parser.add_argument("--targets", default="1000,2500,5000,10000,15000,20000", help="comma list of projectile counts")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args()
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.display.init()
+
+    def stress(target):
+        def setup(sim):
+            quiet_events(sim)
+            sim.spawn_director = BulletHellDirector(target, seed=args.seed)
+        return Scenario(f"bullet_hell_{target}", setup)
+
+    sustained = 0
+    print(f"{'target':>7} {'live':>7} {'step p95':>9} {'draw p95':>9} {'frame mean':>11} {'p95':>7}")
+    for target in (int(v) for v in args.targets.split(",")):
+        result = run_scenario(stress(target), frames=args.frames, seed=args.seed, alloc_frames=0)
+        frame = result['frame_ms']
+        live = int(result['entities']['mean_projectiles'])
+        print(f"{target:>7} {live:>7} {result['step_ms']['p95']:>9.2f} {result['draw_ms']['p95']:>9.2f} "
+              f"{frame['mean']:>11.2f} {frame['p95']:>7.2f}")
+        if frame['p95'] <= FRAME_BUDGET_MS:
+            sustained = max(sustained, live)
+    print(f"sustains {sustained} live projectiles at 60 fps (p95 frame time <= {FRAME_BUDGET_MS:.1f} ms)")
@@ -0,0 +1,43 @@
+import pygame
+
+class DirtyRectTracker:
+    # Collects the screen regions touched this frame and presents only those,
+    # together with last frame's regions so vacated areas are cleared too.
+    # Falls back to a full flip when the regions cover most of the screen.
+    def __init__(self, width, height, full_threshold=0.5, max_rects=500):
+        self.screen_rect = pygame.Rect(0, 0, width, height)
+        self.full_area = width * height * full_threshold
+        self.max_rects = max_rects
+        self.rects = []
+        self.previous = []
+        self.full_redraw = True
+        self.presented = 0
+        self.skipped = 0
+
+    def add(self, rect):
+        rect = self.screen_rect.clip(rect)
+        if rect.width and rect.height:
+            self.rects.append(rect)
+
+    def add_many(self, rects):
+        for rect in rects:
+            self.add(rect)
+
+    def invalidate(self):
+        self.full_redraw = True
+
+    def skip(self):
+        # Nothing changed: keep the last presented frame on screen
+        self.skipped += 1
+
+    def present(self):
+        rects = self.previous + self.rects
+        if (self.full_redraw or len(rects) > self.max_rects or
+                sum(r.width * r.height for r in rects) > self.full_area):
+            pygame.display.flip()
+        elif rects:
+            pygame.display.update(rects)
+        self.presented += 1
+        self.full_redraw = False
+        self.previous = self.rects
+        self.rects = []
@@ -0,0 +1,84 @@
+import numpy as np
+
+def round_half_away(values):
+    # How pygame.Rect rounds floats assigned to its int fields
+    whole = np.trunc(values)
+    return whole + np.sign(values) * (np.abs(values - whole) >= 0.5)
+
+class EntityStore:
+    # Array-backed entities with stable integer ids. A component is a named
+    # group of fields, each field one numpy column exposed as an attribute
+    # (slice it with [:count]). Live entities occupy slots [0, count) in
+    # creation order; removal compacts without reordering. Ids never change
+    # or get reused, while slots shift as earlier entities are removed.
+    def __init__(self, components, capacity=32):
+        self.components = components
+        self.fields = {}
+        for component, fields in components.items():
+            self.fields.update(fields)
+            self.fields['has_' + component] = np.bool_
+        self.count = 0
+        self.next_id = 0
+        self._slots = {}
+        self.id = np.zeros(0, dtype=np.int64)
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        n = self.count
+        for name, dtype in list(self.fields.items()) + [('id', np.int64)]:
+            arr = np.zeros(capacity, dtype=dtype)
+            if n:
+                arr[:n] = getattr(self, name)[:n]
+            setattr(self, name, arr)
+        self.capacity = capacity
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, entity_id):
+        return entity_id in self._slots
+
+    def clear(self):
+        self.count = 0
+        self._slots.clear()
+
+    def create(self, **values):
+        # Unset fields start at zero; the entity has each component it was
+        # given at least one field of
+        if self.count == self.capacity:
+            self._allocate(self.capacity * 2)
+        i = self.count
+        for name, value in values.items():
+            getattr(self, name)[i] = value
+        for component, fields in self.components.items():
+            getattr(self, 'has_' + component)[i] = any(name in values for name in fields)
+            for name in fields:
+                if name not in values:
+                    getattr(self, name)[i] = 0
+        entity_id = self.next_id
+        self.next_id += 1
+        self.id[i] = entity_id
+        self._slots[entity_id] = i
+        self.count += 1
+        return entity_id
+
+    def slot(self, entity_id):
+        return self._slots[entity_id]
+
+    def remove(self, entity_id):
+        self.remove_slots([self._slots[entity_id]])
+
+    def remove_slots(self, slots):
+        n = self.count
+        keep = np.ones(n, dtype=bool)
+        keep[slots] = False
+        for entity_id in self.id[:n][~keep].tolist():
+            del self._slots[entity_id]
+        kept = int(np.count_nonzero(keep))
+        first = int(np.min(slots))
+        for name in list(self.fields) + ['id']:
+            arr = getattr(self, name)
+            arr[:kept] = arr[:n][keep]
+        self.count = kept
+        for i, entity_id in enumerate(self.id[first:kept].tolist(), first):
+            self._slots[entity_id] = i
@@ -0,0 +1,75 @@
+import json
+import os
+import time
+import pygame
+from utils import DATA_DIR
+
+FONT_CACHE_FILE = os.path.join(DATA_DIR, "font_cache.json")
+
+class FontSet:
+    # Named fonts (name -> (family, size)) loaded the first time they are used,
+    # e.g. fonts.small. Resolving a family to a file scans the installed system
+    # fonts on Linux, so resolved paths are kept in a JSON file between runs.
+    # A family that resolves to None uses pygame's default font, like SysFont.
+    def __init__(self, specs, cache_path=FONT_CACHE_FILE):
+        self._specs = specs
+        self._cache_path = cache_path
+        self._fonts = {}
+        self._paths = None
+        self.load_seconds = 0.0
+        self.resolved = 0
+        self.cached = 0
+
+    def __getattr__(self, name):
+        if name.startswith('_') or name not in self._specs:
+            raise AttributeError(name)
+        # Later lookups find the loaded font as a plain attribute
+        font = self.get(name)
+        setattr(self, name, font)
+        return font
+
+    def get(self, name):
+        font = self._fonts.get(name)
+        if font is None:
+            start = time.perf_counter()
+            family, size = self._specs[name]
+            if not pygame.font.get_init():
+                pygame.font.init()
+            font = pygame.font.Font(self.resolve(family), size)
+            self._fonts[name] = font
+            self.load_seconds += time.perf_counter() - start
+        return font
+
+    def resolve(self, family):
+        if self._paths is None:
+            self._paths = self._load_paths()
+        if family in self._paths:
+            path = self._paths[family]
+            if path is None or os.path.exists(path):
+                self.cached += 1
+                return path
+
+        self.resolved += 1
+        path = pygame.font.match_font(family)
+        self._paths[family] = path
+        self._save_paths()
+        return path
+
+    def _load_paths(self):
+        # Cached paths are only trusted for the pygame build that found them
+        try:
+            with open(self._cache_path) as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return {}
+        if data.get('pygame') != pygame.version.ver:
+            return {}
+        return data.get('fonts', {})
+
+    def _save_paths(self):
+        try:
+            os.makedirs(os.path.dirname(self._cache_path) or ".", exist_ok=True)
+            with open(self._cache_path, "w") as file:
+                json.dump({'pygame': pygame.version.ver, 'fonts': self._paths}, file, indent=2)
+        except OSError:
+            pass
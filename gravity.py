@@ -0,0 +1,68 @@
+import numpy as np
+
+WELL_FIELDS = ('x', 'y', 'dx', 'dy', 'ax', 'ay', 'radius', 'strength', 'reach')
+
+class GravityField:
+    # Any number of gravity wells (black holes) held as parallel arrays. Each
+    # well drifts along its own trajectory (velocity plus constant acceleration)
+    # and pulls everything whose center is within `reach` of it. The combined
+    # pull of every well on a batch of entities is one (wells x entities) pass.
+    def __init__(self, margin=100):
+        self.margin = margin
+        self.clear()
+
+    def clear(self):
+        for name in WELL_FIELDS:
+            setattr(self, name, np.zeros(0, dtype=np.float64))
+
+    def __len__(self):
+        return len(self.x)
+
+    def add(self, x, y, dx=0.0, dy=0.0, radius=40, strength=0.7, reach=300, ax=0.0, ay=0.0):
+        values = {'x': x, 'y': y, 'dx': dx, 'dy': dy, 'ax': ax, 'ay': ay,
+                  'radius': radius, 'strength': strength, 'reach': reach}
+        for name in WELL_FIELDS:
+            setattr(self, name, np.append(getattr(self, name), float(values[name])))
+        return len(self.x) - 1
+
+    def wells(self, lag=0.0):
+        # (x, y, radius) per well for drawing, optionally `lag` steps back
+        x, y = self.x, self.y
+        if lag:
+            x = x - self.dx * lag
+            y = y - self.dy * lag
+        return list(zip(x.tolist(), y.tolist(), self.radius.astype(int).tolist()))
+
+    def move(self, factor, width, height):
+        # Advance every well, then drop the ones that left the play area
+        if not len(self.x):
+            return
+        self.dx += self.ax * factor
+        self.dy += self.ay * factor
+        self.x += self.dx * factor
+        self.y += self.dy * factor
+        m = self.margin
+        keep = (self.x >= -m) & (self.x <= width + m) & (self.y >= -m) & (self.y <= height + m)
+        if not keep.all():
+            for name in WELL_FIELDS:
+                setattr(self, name, getattr(self, name)[keep])
+
+    def pull(self, px, py, gain):
+        # Displacement of each entity center (px, py): every well within reach
+        # moves it by offset * gain * strength * (1 - dist/reach). gain may be
+        # a scalar or one value per entity.
+        dx = self.x[:, None] - px[None, :]
+        dy = self.y[:, None] - py[None, :]
+        dist = np.sqrt(dx*dx + dy*dy)
+        reach = self.reach[:, None]
+        force = np.where((dist < reach) & (dist > 0), self.strength[:, None] * (1 - dist/reach), 0.0)
+        return (dx * gain * force).sum(axis=0), (dy * gain * force).sum(axis=0)
+
+    def pull_point(self, px, py, gain, min_dist=10):
+        # Close-range pull on a single point (the player): direction times
+        # strength * (reach - dist) / reach, with dist clamped to min_dist
+        dx = self.x - px
+        dy = self.y - py
+        dist = np.maximum(min_dist, np.sqrt(dx*dx + dy*dy))
+        force = np.where(dist < self.reach, self.strength * (self.reach - dist) / self.reach, 0.0)
+        return float(((dx / dist) * force * gain).sum()), float(((dy / dist) * force * gain).sum())
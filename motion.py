@@ -0,0 +1,82 @@
+from collections import deque
+
+MOTION_MODELS = ('mean', 'ema', 'accel')
+
+class MotionEstimator:
+    # Estimates the player's per-frame velocity from a sliding window of
+    # positions. Running sums are updated as deltas enter and leave the
+    # window, so each prediction is O(1) whatever the window size.
+    #   mean  - average velocity over the window
+    #   ema   - exponentially weighted velocity (alpha weights the newest delta)
+    #   accel - constant-acceleration fit (least squares over the window)
+    def __init__(self, window=20, model='mean', alpha=0.3):
+        if model not in MOTION_MODELS:
+            raise ValueError(f"unknown motion model {model!r}, expected one of {MOTION_MODELS}")
+        if window < 2:
+            raise ValueError("window must hold at least two positions")
+        self.window = window
+        self.model = model
+        self.alpha = alpha
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.last = None
+        self._deltas = deque()
+        self._next_index = 0
+        self._sum_x = self._sum_y = 0.0
+        self._isum_x = self._isum_y = 0.0
+        self._ema_x = self._ema_y = 0.0
+
+    def __len__(self):
+        return self.count
+
+    def append(self, pos):
+        last = self.last
+        if last is not None:
+            dx, dy = pos[0] - last[0], pos[1] - last[1]
+            i = self._next_index
+            self._next_index += 1
+            self._deltas.append((i, dx, dy))
+            self._sum_x += dx
+            self._sum_y += dy
+            self._isum_x += i * dx
+            self._isum_y += i * dy
+            if i == 0:
+                self._ema_x, self._ema_y = dx, dy
+            else:
+                self._ema_x += self.alpha * (dx - self._ema_x)
+                self._ema_y += self.alpha * (dy - self._ema_y)
+
+            if len(self._deltas) >= self.window:
+                j, ox, oy = self._deltas.popleft()
+                self._sum_x -= ox
+                self._sum_y -= oy
+                self._isum_x -= j * ox
+                self._isum_y -= j * oy
+
+        self.last = pos
+        self.count = min(self.count + 1, self.window)
+
+    def _slope(self):
+        # Least-squares slope of velocity against frame index
+        m = len(self._deltas)
+        mean_i = self._deltas[0][0] + (m - 1) / 2
+        spread = m * (m * m - 1) / 12
+        return ((self._isum_x - mean_i * self._sum_x) / spread,
+                (self._isum_y - mean_i * self._sum_y) / spread)
+
+    def velocity(self):
+        # Expected displacement over the next frame
+        m = len(self._deltas)
+        if not m:
+            return 0.0, 0.0
+        if self.model == 'ema':
+            return self._ema_x, self._ema_y
+        vx, vy = self._sum_x / m, self._sum_y / m
+        if self.model == 'accel' and m >= 3:
+            ax, ay = self._slope()
+            ahead = (m - 1) / 2 + 1
+            vx += ax * ahead
+            vy += ay * ahead
+        return vx, vy
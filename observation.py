@@ -0,0 +1,135 @@
+from contextlib import contextmanager
+import numpy as np
+import pygame
+from simulation import WIDTH, HEIGHT
+
+# Downscaled occupancy grids of the game state for bots and headless capture,
+# rasterized straight from the simulator's arrays (no pygame drawing). A grid
+# is (channels, HEIGHT // scale, WIDTH // scale); each cell covers a
+# scale x scale block of the screen.
+#   player, enemy  1 where the rect covers the cell
+#   projectiles    number of projectile centers in the cell
+#   powerups       number of powerup centers in the cell
+#   gravity        combined pull of the black holes at the cell center, as
+#                  strength * (1 - dist/reach) summed over wells within reach
+#   particles      number of particles in the cell
+CHANNELS = ('player', 'enemy', 'projectiles', 'powerups', 'gravity', 'particles')
+
+class ObservationRenderer:
+    def __init__(self, scale=10, dtype=np.float32):
+        self.scale = scale
+        self.rows = HEIGHT // scale
+        self.cols = WIDTH // scale
+        self.dtype = dtype
+        self.shape = (len(CHANNELS), self.rows, self.cols)
+        # Cell centers in screen coordinates, for the gravity channel
+        self.cell_x = (np.arange(self.cols) + 0.5) * scale
+        self.cell_y = (np.arange(self.rows) + 0.5) * scale
+
+    def buffer(self, count=None):
+        # A zeroed buffer for one grid, or `count` stacked grids
+        shape = self.shape if count is None else (count,) + self.shape
+        return np.zeros(shape, dtype=self.dtype)
+
+    def render(self, sim, out=None):
+        # Writes into `out` (any array of self.shape, e.g. one row of a
+        # batch or of a memmap) and returns it
+        if out is None:
+            out = self.buffer()
+        player, enemy, projectiles, powerups, gravity, particles = out
+        self._fill_rect(player, sim.player)
+        self._fill_rect(enemy, sim.enemy)
+        self._count(projectiles, *sim.projectiles.centers())
+        if len(sim.powerups):
+            self._count(powerups, *sim.powerup_centers())
+        else:
+            powerups[:] = 0
+        self._gravity(gravity, sim.gravity)
+        pool = sim.particles
+        self._count(particles, pool.x[:pool.count], pool.y[:pool.count])
+        return out
+
+    def render_batch(self, sims, out=None):
+        if out is None:
+            out = self.buffer(len(sims))
+        for sim, grid in zip(sims, out):
+            self.render(sim, grid)
+        return out
+
+    def _fill_rect(self, channel, rect):
+        channel[:] = 0
+        s = self.scale
+        left, top = max(rect.left // s, 0), max(rect.top // s, 0)
+        right = min((rect.right - 1) // s + 1, self.cols)
+        bottom = min((rect.bottom - 1) // s + 1, self.rows)
+        # Nothing to fill when the rect is off the grid (a negative slice
+        # end would count from the far edge instead)
+        if right > left and bottom > top:
+            channel[top:bottom, left:right] = 1
+
+    def _count(self, channel, x, y):
+        if not len(x):
+            channel[:] = 0
+            return
+        col = np.floor_divide(x, self.scale).astype(np.int64)
+        row = np.floor_divide(y, self.scale).astype(np.int64)
+        inside = (col >= 0) & (col < self.cols) & (row >= 0) & (row < self.rows)
+        if not inside.all():
+            col, row = col[inside], row[inside]
+        cells = self.rows * self.cols
+        channel.reshape(cells)[:] = np.bincount(row * self.cols + col, minlength=cells)
+
+    def _gravity(self, channel, field):
+        if not len(field):
+            channel[:] = 0
+            return
+        # (wells, rows, cols) is small: a handful of wells over a coarse grid
+        dx = self.cell_x[None, None, :] - field.x[:, None, None]
+        dy = self.cell_y[None, :, None] - field.y[:, None, None]
+        dist = np.sqrt(dx*dx + dy*dy)
+        reach = field.reach[:, None, None]
+        pull = np.where(dist < reach, field.strength[:, None, None] * (1 - dist/reach), 0.0)
+        channel[:] = pull.sum(axis=0)
+
+@contextmanager
+def frame_pixels(surface):
+    # Zero-copy (HEIGHT, WIDTH, 3) view of a full-resolution frame. The
+    # surface stays locked while the view exists, so do not keep it (or
+    # anything sliced from it without copying) past the with block.
+    pixels = pygame.surfarray.pixels3d(surface)
+    try:
+        yield pixels.transpose(1, 0, 2)
+    finally:
+        del pixels
+
+if __name__ == "__main__":
+    import argparse
+    import os
+    from bots import make_policy, POLICIES
+    from simulation import GameSimulator
+    from utils import DATA_DIR
+
+    parser = argparse.ArgumentParser(description="Capture occupancy grids from a headless bot game")
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--bot", choices=sorted(POLICIES), default="dodge")
+    parser.add_argument("--scale", type=int, default=10)
+    parser.add_argument("--out", default=os.path.join(DATA_DIR, "observations.npy"))
+    args = parser.parse_args()
+
+    renderer = ObservationRenderer(args.scale)
+    sim = GameSimulator(seed=args.seed)
+    policy = make_policy(args.bot, args.seed)
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    # Each frame is rasterized straight into its row of the .npy file
+    grids = np.lib.format.open_memmap(args.out, mode="w+", dtype=renderer.dtype,
+                                      shape=(args.frames,) + renderer.shape)
+    frames = 0
+    while frames < args.frames and not sim.game_over:
+        sim.step(policy(sim))
+        renderer.render(sim, grids[frames])
+        frames += 1
+    grids.flush()
+    del grids
+    print(f"wrote {frames} frames of {renderer.shape} grids to {args.out}"
+          + (f" (game over at frame {sim.frame}; later rows are zero)" if frames < args.frames else ""))
@@ -0,0 +1,114 @@
+import pygame
+import numpy as np
+
+ALPHA_BUCKETS = 16
+FIELDS = ('x', 'y', 'dx', 'dy', 'life', 'size', 'color')
+
+class ParticlePool:
+    # Fixed-capacity particle storage. Live particles occupy slots [0, count);
+    # dead slots are refilled from the tail so the live range stays packed.
+    def __init__(self, capacity=2048, seed=None):
+        self.capacity = capacity
+        self.count = 0
+        self.rng = np.random.default_rng(seed)
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.dx = np.zeros(capacity, dtype=np.float32)
+        self.dy = np.zeros(capacity, dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.int32)
+        self.size = np.zeros(capacity, dtype=np.int32)
+        self.color = np.zeros(capacity, dtype=np.int32)
+        self.palette = []
+        self._palette_index = {}
+        self._fixed_alpha = np.zeros(0, dtype=bool)
+        self._sprites = {}
+        self.dropped = 0
+
+    def __len__(self):
+        return self.count
+
+    def clear(self, seed=None):
+        self.count = 0
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+
+    def color_index(self, color):
+        index = self._palette_index.get(color)
+        if index is None:
+            index = len(self.palette)
+            self.palette.append(color)
+            self._palette_index[color] = index
+            self._fixed_alpha = np.append(self._fixed_alpha, len(color) == 4)
+        return index
+
+    def add_many(self, x, y, dx, dy, size, life, color):
+        # Particles beyond capacity are dropped so cost stays bounded
+        n = min(len(life), self.capacity - self.count)
+        self.dropped += len(life) - n
+        if n <= 0:
+            return
+        s = slice(self.count, self.count + n)
+        self.x[s] = x[:n]
+        self.y[s] = y[:n]
+        self.dx[s] = dx[:n]
+        self.dy[s] = dy[:n]
+        self.size[s] = size[:n]
+        self.life[s] = life[:n]
+        self.color[s] = self.color_index(color)
+        self.count += n
+
+    def burst(self, x, y, color, count=20):
+        # Small explosion centered on (x, y)
+        self.add_many(*self.burst_columns(x, y, count), color)
+
+    def burst_columns(self, x, y, count=20):
+        # A burst's x, y, dx, dy, size and life columns, for add_many
+        rng = self.rng
+        return (np.full(count, x), np.full(count, y),
+                rng.uniform(-2, 2, count), rng.uniform(-2, 2, count),
+                rng.integers(2, 6, count), rng.integers(20, 41, count))
+
+    def update(self):
+        n = self.count
+        if not n:
+            return
+        self.x[:n] += self.dx[:n]
+        self.y[:n] += self.dy[:n]
+        life = self.life[:n]
+        life -= 1
+
+        dead = np.flatnonzero(life <= 0)
+        if dead.size:
+            alive = n - dead.size
+            holes = dead[dead < alive]
+            if holes.size:
+                movers = np.flatnonzero(self.life[alive:n] > 0) + alive
+                for name in FIELDS:
+                    arr = getattr(self, name)
+                    arr[holes] = arr[movers]
+            self.count = alive
+
+    def _sprite(self, size, color_index, bucket):
+        key = (size, color_index, bucket)
+        sprite = self._sprites.get(key)
+        if sprite is None:
+            color = self.palette[color_index]
+            if len(color) != 4:  # If color has no alpha, fade with life
+                color = (*color, bucket * (256 // ALPHA_BUCKETS) + 8)
+            sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+            pygame.draw.circle(sprite, color, (size//2, size//2), size//2)
+            self._sprites[key] = sprite
+        return sprite
+
+    def draw(self, surface):
+        n = self.count
+        if not n:
+            return
+        colors = self.color[:n]
+        buckets = np.minimum(255, self.life[:n] * 6) * ALPHA_BUCKETS // 256
+        buckets[self._fixed_alpha[colors]] = 0
+        keys = zip(self.size[:n].tolist(), colors.tolist(), buckets.tolist())
+        positions = zip(self.x[:n].tolist(), self.y[:n].tolist())
+        sprites = self._sprites
+        sprite = self._sprite
+        surface.blits([(sprites.get(key) or sprite(*key), pos) for key, pos in zip(keys, positions)], False)
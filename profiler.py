@@ -0,0 +1,149 @@
+import csv
+import os
+import time
+from collections import deque
+import pygame
+from text_cache import TextCache
+
+# Lap-style frame profiler. Every lap(name) charges the time since the previous
+# lap to that phase. Callers only hold a profiler while it is enabled (or test
+# `enabled` first), so profiling off costs one check per phase.
+
+FRAME_BUDGET_MS = 1000 / 60
+
+class FrameProfiler:
+    def __init__(self, history=240, summary_interval=30, max_records=36000):
+        self.enabled = False
+        self.history = history
+        self.summary_interval = summary_interval
+        self.max_records = max_records
+        self.frame_ms = deque(maxlen=history)
+        self.phases = deque(maxlen=history)
+        self.phase_names = []
+        self.records = deque(maxlen=max_records)
+        self.summary = []
+        self.summary_header = "collecting..."
+        # Latest value of each gauge (e.g. spawn queue depth), shown in the overlay
+        self.gauges = {}
+        self.frame = 0
+        self._current = {}
+        self._frame_start = self._last = 0
+        self._panel = None
+        self._font = None
+        self._text_cache = TextCache(maxsize=64)
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        if not self.enabled:
+            self.frame_ms.clear()
+            self.phases.clear()
+            self.summary = []
+            self.summary_header = "collecting..."
+
+    def begin_frame(self):
+        self._current = {}
+        self._frame_start = self._last = time.perf_counter_ns()
+
+    def lap(self, name):
+        now = time.perf_counter_ns()
+        current = self._current
+        current[name] = current.get(name, 0) + now - self._last
+        self._last = now
+
+    def gauge(self, name, value):
+        self.gauges[name] = value
+
+    def end_frame(self):
+        total = (time.perf_counter_ns() - self._frame_start) / 1e6
+        phases = {name: ns / 1e6 for name, ns in self._current.items()}
+        for name in phases:
+            if name not in self.phase_names:
+                self.phase_names.append(name)
+        self.frame_ms.append(total)
+        self.phases.append(phases)
+        self.records.append((self.frame, total, phases))
+        self.frame += 1
+        if self.frame % self.summary_interval == 0:
+            self.summary = self.summarize()
+            self.summary_header = f"frame {sum(self.frame_ms) / len(self.frame_ms):.2f} ms avg  {max(self.frame_ms):.2f} max"
+
+    def summarize(self):
+        # (phase, mean ms, max ms) over the rolling window, slowest first
+        n = len(self.phases)
+        if not n:
+            return []
+        totals, peaks = {}, {}
+        for phases in self.phases:
+            for name, ms in phases.items():
+                totals[name] = totals.get(name, 0.0) + ms
+                if ms > peaks.get(name, 0.0):
+                    peaks[name] = ms
+        return sorted(((name, totals[name] / n, peaks[name]) for name in totals), key=lambda row: -row[1])
+
+    def dump(self, path):
+        # One row per recorded frame, one column per phase (ms)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, mode="w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["frame", "total_ms"] + self.phase_names)
+            for frame, total, phases in self.records:
+                writer.writerow([frame, f"{total:.4f}"] + [f"{phases.get(name, 0.0):.4f}" for name in self.phase_names])
+        return len(self.records)
+
+    def overlay_rect(self, surface):
+        return pygame.Rect(surface.get_width() - 270, 80, 260, 245)
+
+    def draw(self, surface):
+        rect = self.overlay_rect(surface)
+        if self._panel is None:
+            self._panel = pygame.Surface(rect.size, pygame.SRCALPHA)
+            self._panel.fill((0, 0, 0, 180))
+            if not pygame.font.get_init():
+                pygame.font.init()
+            self._font = pygame.font.Font(None, 18)
+        surface.blit(self._panel, rect)
+
+        # Rolling frame-time graph, scaled to two frame budgets
+        graph = pygame.Rect(rect.x + 10, rect.y + 10, rect.width - 20, 60)
+        scale = graph.height / (FRAME_BUDGET_MS * 2)
+        budget_y = graph.bottom - int(FRAME_BUDGET_MS * scale)
+        pygame.draw.line(surface, (90, 90, 90), (graph.left, budget_y), (graph.right, budget_y))
+        if len(self.frame_ms) > 1:
+            step = graph.width / (self.history - 1)
+            points = [(graph.left + int(i * step), graph.bottom - min(graph.height, int(ms * scale)))
+                      for i, ms in enumerate(self.frame_ms)]
+            pygame.draw.lines(surface, (0, 255, 0), False, points)
+
+        # Per-phase breakdown, refreshed every summary_interval frames
+        render = self._text_cache.render
+        y = graph.bottom + 6
+        surface.blit(render(self._font, self.summary_header, True, (255, 255, 255)), (rect.x + 10, y))
+        if self.gauges:
+            y += 15
+            gauges = "  ".join(f"{name} {value}" for name, value in self.gauges.items())
+            surface.blit(render(self._font, gauges, True, (255, 220, 120)), (rect.x + 10, y))
+        for name, mean, peak in self.summary[:10]:
+            y += 15
+            surface.blit(render(self._font, name, True, (200, 200, 200)), (rect.x + 10, y))
+            for text, right in ((f"{mean:.2f}", rect.right - 60), (f"{peak:.2f}", rect.right - 10)):
+                text_surf = render(self._font, text, True, (200, 200, 200))
+                surface.blit(text_surf, (right - text_surf.get_width(), y))
+
+class StartupTimer:
+    # Wall-clock breakdown of startup, one entry per mark(name) since the last
+    def __init__(self, start=None):
+        self.start = self._last = start if start is not None else time.perf_counter()
+        self.phases = []
+
+    def mark(self, name):
+        now = time.perf_counter()
+        self.phases.append((name, now - self._last))
+        self._last = now
+
+    def total(self):
+        return self._last - self.start
+
+    def report(self):
+        lines = [f"{name:<16}{seconds * 1000:8.1f} ms" for name, seconds in self.phases]
+        lines.append(f"{'total':<16}{self.total() * 1000:8.1f} ms")
+        return "\n".join(lines)
@@ -0,0 +1,134 @@
+from itertools import repeat
+import numpy as np
+import pygame
+
+PROJECTILE_SIZE = 10
+FIELDS = ('x', 'y', 'dx', 'dy', 'w', 'h')
+
+class ProjectileStore:
+    # Structure-of-arrays projectile storage. Live projectiles occupy slots
+    # [0, count); every per-frame operation is a single vectorized pass.
+    def __init__(self, capacity=256):
+        self.count = 0
+        self._sprites = {}
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        for name in FIELDS:
+            arr = np.zeros(capacity, dtype=np.float64)
+            if self.count:
+                arr[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, arr)
+        self.capacity = capacity
+
+    def _reserve(self, extra):
+        needed = self.count + extra
+        if needed > self.capacity:
+            capacity = self.capacity
+            while capacity < needed:
+                capacity *= 2
+            self._allocate(capacity)
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+
+    def add(self, x, y, dx, dy, size=PROJECTILE_SIZE):
+        self._reserve(1)
+        i = self.count
+        self.x[i], self.y[i] = x, y
+        self.dx[i], self.dy[i] = dx, dy
+        self.w[i] = self.h[i] = size
+        self.count += 1
+
+    def add_many(self, x, y, dx, dy, size=PROJECTILE_SIZE):
+        n = len(x)
+        self._reserve(n)
+        s = slice(self.count, self.count + n)
+        self.x[s], self.y[s] = x, y
+        self.dx[s], self.dy[s] = dx, dy
+        self.w[s] = self.h[s] = size
+        self.count += n
+
+    def scale_velocity(self, factor):
+        n = self.count
+        self.dx[:n] *= factor
+        self.dy[:n] *= factor
+
+    def centers(self):
+        n = self.count
+        return self.x[:n] + self.w[:n] / 2, self.y[:n] + self.h[:n] / 2
+
+    def move(self, warp=1.0):
+        n = self.count
+        self.x[:n] += self.dx[:n] * warp
+        self.y[:n] += self.dy[:n] * warp
+
+    def cull(self, left, top, right, bottom):
+        # Drop projectiles outside the bounds, keeping order; returns how many left
+        n = self.count
+        x, y = self.x[:n], self.y[:n]
+        keep = (x >= left) & (x <= right) & (y >= top) & (y <= bottom)
+        kept = int(np.count_nonzero(keep))
+        if kept != n:
+            for name in FIELDS:
+                arr = getattr(self, name)
+                arr[:kept] = arr[:n][keep]
+            self.count = kept
+        return n - kept
+
+    def overlap_mask(self, rect):
+        # Same strict-edge AABB test as pygame.Rect.colliderect
+        n = self.count
+        x, y = self.x[:n], self.y[:n]
+        return ((x < rect[0] + rect[2]) & (x + self.w[:n] > rect[0]) &
+                (y < rect[1] + rect[3]) & (y + self.h[:n] > rect[1]))
+
+    def any_overlapping(self, rect):
+        return bool(self.overlap_mask(rect).any())
+
+    def int_rects(self, lag=0.0):
+        # lag > 0 gives positions that many (warped) steps back along each velocity
+        n = self.count
+        x, y = self.x[:n], self.y[:n]
+        if lag:
+            x = x - self.dx[:n] * lag
+            y = y - self.dy[:n] * lag
+        return np.stack((x, y, self.w[:n], self.h[:n]), axis=1).round().astype(np.int32).tolist()
+
+    def _sprite(self, width, height, color):
+        key = (width, height, color)
+        sprite = self._sprites.get(key)
+        if sprite is None:
+            sprite = pygame.Surface((width, height))
+            sprite.fill(color)
+            self._sprites[key] = sprite
+        return sprite
+
+    def draw(self, surface, color, lag=0.0):
+        # Same pixels as pygame.draw.rect over int_rects(lag), but as one
+        # blits() call with a cached solid sprite per size, skipping any
+        # projectile that is entirely off the surface
+        n = self.count
+        if not n:
+            return
+        x, y = self.x[:n], self.y[:n]
+        if lag:
+            x = x - self.dx[:n] * lag
+            y = y - self.dy[:n] * lag
+        x, y = x.round(), y.round()
+        w, h = self.w[:n].round(), self.h[:n].round()
+        width, height = surface.get_size()
+        visible = (x < width) & (x + w > 0) & (y < height) & (y + h > 0)
+        if not visible.all():
+            x, y, w, h = x[visible], y[visible], w[visible], h[visible]
+        if not x.size:
+            return
+        positions = zip(x.astype(np.int32).tolist(), y.astype(np.int32).tolist())
+        if (w == w[0]).all() and (h == h[0]).all():
+            sprites = repeat(self._sprite(int(w[0]), int(h[0]), color))
+        else:
+            sprites = [self._sprite(sw, sh, color) for sw, sh in zip(w.astype(np.int32).tolist(), h.astype(np.int32).tolist())]
+        surface.blits(zip(sprites, positions), False)
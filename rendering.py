@@ -0,0 +1,433 @@
+import pygame
+import random
+import math
+from simulation import (
+    PowerUpType, SpecialEvent, POWERUP_TYPES, POWERUP_COLORS, WIDTH, HEIGHT,
+    WHITE, GREEN, RED, BLUE, BLACK, YELLOW, PURPLE, ORANGE, CYAN, PINK, LIGHT_GRAY, DARK_GRAY
+)
+from text_cache import TextCache
+from fonts import FontSet
+from surface_cache import SurfaceCache, quantize_alpha
+
+# Target surface and simulator being drawn; set by init()
+win = None
+sim = None
+
+# Fonts, each loaded on first use (the title font only by the main menu)
+fonts = FontSet({
+    'small': ("Arial", 20),
+    'medium': ("Arial", 24),
+    'large': ("Arial", 48),
+    'title': ("Impact", 72),
+})
+
+# Rendered text surfaces, reused across frames
+text_cache = TextCache()
+
+# Pre-rendered alpha effect surfaces (rings, shield, overlays)
+surface_cache = SurfaceCache()
+
+# Optional FrameProfiler; draw_game() times its parts while one is attached
+profiler = None
+
+# Render interpolation for the fixed-timestep loop: player and enemy positions
+# before the latest step, and how far (0-1) the drawn frame is from them to
+# the current state. 1.0 draws the current state as is.
+previous_positions = None
+interpolation = 1.0
+
+# (rank, games) of the last finished game, set by main.end_game
+game_over_rank = None
+
+# Eye animation variables
+BLINK_RATE = 0.01
+BLINK_DURATION = 10
+player_blinking = 0
+enemy_blinking = 0
+blink_rng = random.Random()
+
+class Button:
+    def __init__(self, x, y, width, height, text, color, hover_color, text_color=WHITE):
+        self.rect = pygame.Rect(x, y, width, height)
+        self.text = text
+        self.color = color
+        self.hover_color = hover_color
+        self.text_color = text_color
+        self.is_hovered = False
+        
+    def draw(self, surface):
+        color = self.hover_color if self.is_hovered else self.color
+        pygame.draw.rect(surface, color, self.rect, border_radius=10)
+        pygame.draw.rect(surface, BLACK, self.rect, 2, border_radius=10)
+        
+        text_surf = text_cache.render(fonts.medium, self.text, True, self.text_color)
+        text_rect = text_surf.get_rect(center=self.rect.center)
+        surface.blit(text_surf, text_rect)
+        
+    def check_hover(self, pos):
+        self.is_hovered = self.rect.collidepoint(pos)
+        return self.is_hovered
+
+    def dirty_key(self):
+        return self.is_hovered
+
+    def bounds(self):
+        return self.rect
+        
+    def is_clicked(self, pos, event):
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            return self.rect.collidepoint(pos)
+        return False
+
+class Slider:
+    def __init__(self, x, y, width, height, min_val, max_val, initial_val, text):
+        self.rect = pygame.Rect(x, y, width, height)
+        self.knob_rect = pygame.Rect(x, y, 20, height + 10)
+        self.min_val = min_val
+        self.max_val = max_val
+        self.value = initial_val
+        self.text = text
+        self.dragging = False
+        self.update_knob_pos()
+        
+    def update_knob_pos(self):
+        relative_val = (self.value - self.min_val) / (self.max_val - self.min_val)
+        self.knob_rect.x = self.rect.x + int(relative_val * self.rect.width) - 10
+        
+    def draw(self, surface):
+        # Draw slider track
+        pygame.draw.rect(surface, LIGHT_GRAY, self.rect, border_radius=5)
+        pygame.draw.rect(surface, DARK_GRAY, self.rect, 2, border_radius=5)
+        
+        # Draw slider knob
+        pygame.draw.rect(surface, BLUE, self.knob_rect, border_radius=5)
+        pygame.draw.rect(surface, BLACK, self.knob_rect, 2, border_radius=5)
+        
+        # Draw text and value
+        text_surf = text_cache.render(fonts.small, f"{self.text}: {self.value:.1f}", True, WHITE)
+        surface.blit(text_surf, (self.rect.x, self.rect.y - 25))
+        
+    def dirty_key(self):
+        return self.value
+
+    def bounds(self):
+        # Track, knob and the value label above it
+        return pygame.Rect(self.rect.x - 10, self.rect.y - 25, self.rect.width + 20, self.rect.height + 35)
+
+    def handle_event(self, event):
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            if self.knob_rect.collidepoint(event.pos):
+                self.dragging = True
+        elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+            self.dragging = False
+        elif event.type == pygame.MOUSEMOTION and self.dragging:
+            # Calculate new value based on mouse position
+            mouse_x = max(self.rect.left, min(event.pos[0], self.rect.right))
+            relative_pos = (mouse_x - self.rect.left) / self.rect.width
+            self.value = self.min_val + relative_pos * (self.max_val - self.min_val)
+            self.update_knob_pos()
+            return True
+        return False
+
+# GUI Elements
+play_button = Button(WIDTH//2 - 100, 300, 200, 50, "Play", BLUE, PURPLE)
+settings_button = Button(WIDTH//2 - 100, 370, 200, 50, "Settings", BLUE, PURPLE)
+quit_button = Button(WIDTH//2 - 100, 440, 200, 50, "Quit", RED, (255, 100, 100))
+restart_button = Button(WIDTH//2 - 100, 400, 200, 50, "Play Again", BLUE, PURPLE)
+menu_button = Button(WIDTH//2 - 100, 480, 200, 50, "Main Menu", BLUE, PURPLE)
+back_button = Button(50, HEIGHT - 80, 150, 50, "Back", BLUE, PURPLE)
+ai_aggressiveness_slider = Slider(300, 300, 400, 20, 0.1, 2.0, 1.0, "AI Aggressiveness")
+player_speed_slider = Slider(300, 400, 400, 20, 3, 10, 5, "Player Speed")
+
+def init(surface, simulator):
+    global win, sim
+    win = surface
+    sim = simulator
+
+def capture_previous():
+    global previous_positions
+    previous_positions = (sim.player.topleft, sim.enemy.topleft)
+
+def interpolated_rects():
+    if previous_positions is None or interpolation >= 1.0:
+        return sim.player, sim.enemy
+    back = 1.0 - interpolation
+    rects = []
+    for rect, (x, y) in zip((sim.player, sim.enemy), previous_positions):
+        rects.append(rect.move(round((x - rect.x) * back), round((y - rect.y) * back)))
+    return rects
+
+def interpolation_lag():
+    # Steps along their velocities that projectiles and wells are drawn behind
+    return (1.0 - interpolation) * sim.time_warp_factor
+
+def draw_eyes(rect, direction, blinking, color=WHITE):
+    if blinking > 0:
+        pygame.draw.arc(win, color, (rect.centerx - 10, rect.centery - 5, 20, 10), 0, math.pi, 2)
+        pygame.draw.arc(win, color, (rect.centerx - 10, rect.centery - 5, 20, 10), 0, math.pi, 2)
+    else:
+        dir_len = math.sqrt(direction[0]**2 + direction[1]**2)
+        norm_dir = (direction[0]/max(dir_len, 0.1), direction[1]/max(dir_len, 0.1))
+        
+        pygame.draw.circle(win, color, (int(rect.centerx - 5 + norm_dir[0] * 8), int(rect.centery - 5 + norm_dir[1] * 5)), 3)
+        pygame.draw.circle(win, color, (int(rect.centerx + 5 + norm_dir[0] * 8), int(rect.centery - 5 + norm_dir[1] * 5)), 3)
+
+def update_blinking():
+    global player_blinking, enemy_blinking
+    
+    if player_blinking > 0:
+        player_blinking -= 1
+    elif blink_rng.random() < BLINK_RATE:
+        player_blinking = BLINK_DURATION
+        
+    if enemy_blinking > 0:
+        enemy_blinking -= 1
+    elif blink_rng.random() < BLINK_RATE:
+        enemy_blinking = BLINK_DURATION
+
+def build_accretion_disk(radius):
+    # Three concentric rings on one surface
+    outer = radius + 45
+    s = pygame.Surface((outer*2, outer*2), pygame.SRCALPHA)
+    for i in range(1, 4):
+        pygame.draw.circle(s, (255, 100, 100, 150), (outer, outer), radius + i * 15, 3)  # Bright pink
+    return s
+
+def build_alpha_fill(size, rgba):
+    s = pygame.Surface(size, pygame.SRCALPHA)
+    s.fill(rgba)
+    return s
+
+def build_shield(player_size, alpha):
+    s = pygame.Surface((player_size + 20, player_size + 20), pygame.SRCALPHA)
+    pygame.draw.circle(s, (*CYAN, alpha), (player_size//2 + 10, player_size//2 + 10), player_size//2 + 10, 3)
+    return s
+
+def draw_special_event_effects():
+    for x, y, radius in sim.gravity.wells(interpolation_lag()):
+        center = (int(x), int(y))
+        # Change colors to be more visible (temporarily for testing)
+        pygame.draw.circle(win, (255, 0, 0), center, radius)  # Red for testing
+        pygame.draw.circle(win, (150, 0, 0), center, radius - 10)
+        
+        # Draw bright accretion disk
+        disk = surface_cache.get(('accretion_disk', radius), lambda: build_accretion_disk(radius))
+        outer = disk.get_width() // 2
+        win.blit(disk, (int(x - outer), int(y - outer)))
+
+def draw_powerup_indicator():
+    active_powerup = sim.active_powerup
+    if active_powerup:
+        # Background bar
+        bar_width = 200
+        bar_height = 20
+        bar_x = WIDTH//2 - bar_width//2
+        bar_y = 10
+        
+        # Calculate progress
+        progress = 1 - (sim.powerup_active_time / sim.powerup_duration)
+        
+        # Draw background
+        pygame.draw.rect(win, DARK_GRAY, (bar_x, bar_y, bar_width, bar_height), border_radius=10)
+        # Draw progress
+        pygame.draw.rect(win, BLUE, (bar_x, bar_y, int(bar_width * progress), bar_height), border_radius=10)
+        # Draw border
+        pygame.draw.rect(win, WHITE, (bar_x, bar_y, bar_width, bar_height), 2, border_radius=10)
+        
+        # Draw powerup icon
+        icon_size = 15
+        if active_powerup == PowerUpType.SPEED_BOOST:
+            pygame.draw.polygon(win, ORANGE, [
+                (bar_x + 5, bar_y + bar_height//2),
+                (bar_x + 5 + icon_size, bar_y + bar_height),
+                (bar_x + 5 + icon_size, bar_y)
+            ])
+        elif active_powerup == PowerUpType.SHIELD:
+            pygame.draw.circle(win, CYAN, (bar_x + 5 + icon_size//2, bar_y + bar_height//2), icon_size//2, 2)
+        elif active_powerup == PowerUpType.TIME_SLOW:
+            pygame.draw.rect(win, PURPLE, (bar_x + 5, bar_y + 2, icon_size, bar_height - 4))
+        elif active_powerup == PowerUpType.MAGNET:
+            pygame.draw.line(win, YELLOW, (bar_x + 5, bar_y + bar_height//2), 
+                           (bar_x + 5 + icon_size, bar_y + bar_height//2), 3)
+            pygame.draw.line(win, YELLOW, (bar_x + 5 + icon_size//2, bar_y + 2), 
+                           (bar_x + 5 + icon_size//2, bar_y + bar_height - 2), 3)
+
+def draw_special_event_indicator():
+    special_event_active = sim.special_event_active
+    if special_event_active:
+        event_names = {
+            SpecialEvent.RAIN_OF_FIRE: "RAIN OF FIRE!",
+            SpecialEvent.MOVING_BLACK_HOLE: "MOVING BLACK HOLE!",  # Updated
+            SpecialEvent.TIME_WARP: "TIME WARP!"
+        }
+        
+        text = text_cache.render(fonts.medium, event_names[special_event_active], True, RED)
+        
+        # Pulsing effect
+        pulse = quantize_alpha(abs(math.sin(pygame.time.get_ticks() * 0.005)) * 255)
+        size = (text.get_width() + 20, text.get_height() + 10)
+        s = surface_cache.get(('event_banner', size, pulse), lambda: build_alpha_fill(size, (255, 255, 255, pulse//3)))
+        win.blit(s, (WIDTH//2 - text.get_width()//2 - 10, HEIGHT - 60))
+        
+        win.blit(text, (WIDTH//2 - text.get_width()//2, HEIGHT - 50))
+        
+        # Draw event-specific effects
+        draw_special_event_effects()
+        
+def draw_main_menu():
+    win.fill(BLACK)
+    title_text = text_cache.render(fonts.title, "DodgeMaster++", True, BLUE)
+    subtitle_text = text_cache.render(fonts.large, "Enhanced Edition", True, PURPLE)
+    win.blit(title_text, (WIDTH//2 - title_text.get_width()//2, 100))
+    win.blit(subtitle_text, (WIDTH//2 - subtitle_text.get_width()//2, 180))
+    
+    play_button.draw(win)
+    settings_button.draw(win)
+    quit_button.draw(win)
+    
+    footer_text = text_cache.render(fonts.small, "Use arrow keys or WASD to move. Avoid the red squares!", True, WHITE)
+    win.blit(footer_text, (WIDTH//2 - footer_text.get_width()//2, HEIGHT - 50))
+
+def draw_settings():
+    win.fill(BLACK)
+    
+    title_text = text_cache.render(fonts.large, "Settings", True, WHITE)
+    win.blit(title_text, (WIDTH//2 - title_text.get_width()//2, 100))
+    
+    ai_aggressiveness_slider.draw(win)
+    player_speed_slider.draw(win)
+    
+    info_text = text_cache.render(fonts.small, "Adjust the AI behavior and game parameters", True, WHITE)
+    win.blit(info_text, (WIDTH//2 - info_text.get_width()//2, 200))
+    
+    back_button.draw(win)
+
+def draw_game():
+    player, enemy = interpolated_rects()
+    prof = profiler
+    win.fill(BLACK)
+    update_blinking()
+    
+    # Draw particles first (background effects)
+    sim.particles.draw(win)
+    if prof:
+        prof.lap('draw_particles')
+    
+    # Draw black hole if active
+    draw_special_event_effects()
+    if prof:
+        prof.lap('draw_special_event_effects')
+    
+    # Draw powerups
+    powerups = sim.powerups
+    n = powerups.count
+    # Animate powerup pulsing
+    powerups.animation_timer[:n] += 1
+    centers_x, centers_y = sim.powerup_centers()
+    for centerx, centery, kind, timer in zip(centers_x.tolist(), centers_y.tolist(),
+                                             powerups.kind[:n].tolist(), powerups.animation_timer[:n].tolist()):
+        powerup_type = POWERUP_TYPES[kind]
+        center = (centerx, centery)
+        pulse = math.sin(timer * 0.1) * 2 + 22
+        pygame.draw.circle(win, POWERUP_COLORS[powerup_type], center, int(pulse))
+        pygame.draw.circle(win, WHITE, center, 10)
+        
+        # Draw icon based on powerup type
+        if powerup_type == PowerUpType.SPEED_BOOST:
+            pygame.draw.polygon(win, BLACK, [
+                (centerx, centery - 8),
+                (centerx + 8, centery + 8),
+                (centerx - 8, centery + 8)
+            ])
+        elif powerup_type == PowerUpType.SHIELD:
+            pygame.draw.circle(win, BLACK, center, 6, 2)
+            pygame.draw.circle(win, BLACK, center, 8, 2)
+        elif powerup_type == PowerUpType.TIME_SLOW:
+            pygame.draw.rect(win, BLACK, (centerx - 6, centery - 8, 12, 16))
+        elif powerup_type == PowerUpType.MAGNET:
+            pygame.draw.line(win, BLACK, 
+                           (centerx - 8, centery),
+                           (centerx + 8, centery), 3)
+            pygame.draw.line(win, BLACK, 
+                           (centerx, centery - 8),
+                           (centerx, centery + 8), 3)
+    
+    if prof:
+        prof.lap('draw_powerups')
+
+    # Draw characters with eyes
+    pygame.draw.rect(win, GREEN, player)
+    draw_eyes(player, sim.player_eye_direction, player_blinking)
+    
+    # Draw shield if active
+    if sim.shield_active:
+        player_size = sim.player_size
+        shield_alpha = quantize_alpha(min(255, (sim.powerup_duration - sim.powerup_active_time) * 255 // sim.powerup_duration))
+        s = surface_cache.get(('shield', player_size, shield_alpha), lambda: build_shield(player_size, shield_alpha))
+        win.blit(s, (player.x - 10, player.y - 10))
+    
+    pygame.draw.rect(win, BLUE, enemy)
+    draw_eyes(enemy, sim.enemy_eye_direction, enemy_blinking)
+    
+    if prof:
+        prof.lap('draw_characters')
+
+    sim.projectiles.draw(win, RED, interpolation_lag())
+    if prof:
+        prof.lap('draw_projectiles')
+    
+    # Draw active powerup indicator
+    draw_powerup_indicator()
+    if prof:
+        prof.lap('draw_powerup_indicator')
+    
+    # Draw special event indicator
+    draw_special_event_indicator()
+    if prof:
+        prof.lap('draw_special_event_indicator')
+    
+    # Display stats
+    score_text = text_cache.render(fonts.medium, f"Score: {sim.score}", True, WHITE)
+    difficulty_text = text_cache.render(fonts.medium, f"AI Aggressiveness: {sim.ai_controller.aggressiveness:.1f}", True, WHITE)
+    win.blit(score_text, (10, 10))
+    win.blit(difficulty_text, (10, 40))
+    
+    # Draw time warp effect if active
+    if sim.time_warp_factor != 1.0:
+        warp_text = text_cache.render(fonts.small, f"TIME x{sim.time_warp_factor:.1f}", True, PINK)
+        win.blit(warp_text, (WIDTH - 100, 40))
+    if prof:
+        prof.lap('draw_hud')
+
+def draw_game_over():
+    score = sim.score
+    win.fill(BLACK)
+    game_over_text = text_cache.render(fonts.large, "Game Over!", True, RED)
+    score_text = text_cache.render(fonts.medium, f"Final Score: {score}", True, WHITE)
+    win.blit(game_over_text, (WIDTH//2 - game_over_text.get_width()//2, 200))
+    win.blit(score_text, (WIDTH//2 - score_text.get_width()//2, 280))
+    
+    feedback = ""
+    if score > 5000:
+        feedback = "Amazing! You're an AI training master!"
+    elif score > 2000:
+        feedback = "Great job! The AI had trouble predicting you!"
+    else:
+        feedback = "The AI outsmarted you this time. Try again!"
+    
+    feedback_text = text_cache.render(fonts.medium, feedback, True, YELLOW)
+    win.blit(feedback_text, (WIDTH//2 - feedback_text.get_width()//2, 340))
+
+    if game_over_rank:
+        rank, games = game_over_rank
+        rank_text = text_cache.render(fonts.small, f"Rank #{rank} of {games}", True, WHITE)
+        win.blit(rank_text, (WIDTH//2 - rank_text.get_width()//2, 312))
+    
+    restart_button.draw(win)
+    menu_button.draw(win)
+
+def draw_pause_overlay():
+    s = surface_cache.get(('pause_overlay',), lambda: build_alpha_fill((WIDTH, HEIGHT), (0, 0, 0, 180)))
+    win.blit(s, (0, 0))
+    pause_text = text_cache.render(fonts.large, "PAUSED", True, WHITE)
+    win.blit(pause_text, (WIDTH//2 - pause_text.get_width()//2, HEIGHT//2))
@@ -0,0 +1,146 @@
+import hashlib
+import os
+import struct
+import zlib
+from simulation import GameSimulator
+from bullet_hell import BulletHellDirector
+
+# Replay file layout: fixed header followed by the zlib-compressed per-frame
+# input bitmasks, one byte per simulated frame. The header also records how
+# the game ended (game-over frame or -1, hits avoided, final state hash) so
+# playback can tell a faithful replay from a desynced one, and the bullet
+# hell target (0 when off), since that mode changes the game.
+REPLAY_MAGIC = b"DMRP"
+REPLAY_VERSION = 3
+HEADER = struct.Struct("<4sHQddIIiI8sI")
+
+def state_hash(sim):
+    # Fingerprint of the simulator state that any divergence would disturb
+    h = hashlib.blake2b(digest_size=8)
+    n = sim.projectiles.count
+    h.update(struct.pack("<iiiiiiii", *sim.player, *sim.enemy))
+    h.update(struct.pack("<qqq?", sim.frame, sim.score, sim.hits_avoided, sim.game_over))
+    h.update(sim.projectiles.x[:n].tobytes())
+    h.update(sim.projectiles.y[:n].tobytes())
+    return h.digest()
+
+class Replay:
+    def __init__(self, seed, aggressiveness, player_speed, inputs=b"", final_score=0,
+                 game_over_frame=-1, hits_avoided=0, final_hash=bytes(8), bullet_hell=0):
+        self.seed = seed
+        self.aggressiveness = aggressiveness
+        self.player_speed = player_speed
+        self.inputs = bytearray(inputs)
+        self.final_score = final_score
+        self.game_over_frame = game_over_frame
+        self.hits_avoided = hits_avoided
+        self.final_hash = final_hash
+        self.bullet_hell = bullet_hell
+
+    def __len__(self):
+        return len(self.inputs)
+
+    def new_simulator(self):
+        sim = GameSimulator(seed=self.seed, aggressiveness=self.aggressiveness, player_speed=self.player_speed)
+        if self.bullet_hell:
+            sim.spawn_director = BulletHellDirector(self.bullet_hell, seed=self.seed)
+        return sim
+
+    def to_bytes(self):
+        header = HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, self.seed, self.aggressiveness,
+                             self.player_speed, len(self.inputs), self.final_score,
+                             self.game_over_frame, self.hits_avoided, self.final_hash, self.bullet_hell)
+        return header + zlib.compress(bytes(self.inputs), 9)
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version = struct.unpack_from("<4sH", data)
+        if magic != REPLAY_MAGIC:
+            raise ValueError("not a DodgeMaster++ replay file")
+        if version != REPLAY_VERSION:
+            raise ValueError(f"unsupported replay version {version}")
+        (_, _, seed, aggressiveness, player_speed, frames, final_score,
+         game_over_frame, hits_avoided, final_hash, bullet_hell) = HEADER.unpack_from(data)
+        inputs = zlib.decompress(data[HEADER.size:])
+        if len(inputs) != frames:
+            raise ValueError(f"replay is truncated: expected {frames} frames, found {len(inputs)}")
+        return cls(seed, aggressiveness, player_speed, inputs, final_score, game_over_frame, hits_avoided, final_hash,
+                   bullet_hell)
+
+def game_path(path, seed):
+    # One file per recorded game: run.replay -> run.<seed>.replay
+    root, ext = os.path.splitext(path)
+    return f"{root}.{seed}{ext}"
+
+def save_replay(replay, path):
+    with open(path, "wb") as file:
+        file.write(replay.to_bytes())
+
+def load_replay(path):
+    with open(path, "rb") as file:
+        return Replay.from_bytes(file.read())
+
+class ReplayRecorder:
+    # Captures the seed, settings and input bitmask of every simulated frame
+    def __init__(self, seed, aggressiveness, player_speed, bullet_hell=0):
+        self.replay = Replay(seed, aggressiveness, player_speed, bullet_hell=bullet_hell)
+
+    def record(self, inputs):
+        self.replay.inputs.append(inputs)
+
+    def save(self, path, sim):
+        # Saves the inputs so far with how the game stood after the last one
+        replay = self.replay
+        replay.final_score = sim.score
+        replay.game_over_frame = sim.frame if sim.game_over else -1
+        replay.hits_avoided = sim.hits_avoided
+        replay.final_hash = state_hash(sim)
+        save_replay(replay, path)
+
+def play_replay(replay):
+    # Fast-forward playback without rendering, stopping at game over;
+    # returns the finished simulator
+    sim = replay.new_simulator()
+    for inputs in replay.inputs:
+        sim.step(inputs)
+        if sim.game_over:
+            break
+    return sim
+
+def check_replay(replay, sim):
+    # Differences between a played-back simulator and the recording; empty
+    # when the playback reproduced the recorded game
+    problems = []
+    recorded = len(replay)
+    if sim.game_over and sim.frame < recorded:
+        problems.append(f"game over at frame {sim.frame}, {recorded - sim.frame} frames before the recording ends")
+    elif not sim.game_over and replay.game_over_frame >= 0:
+        problems.append(f"no game over after {sim.frame} frames; recorded game over at frame {replay.game_over_frame}")
+    elif sim.game_over and replay.game_over_frame < 0:
+        problems.append(f"game over at frame {sim.frame}; the recorded game never ended")
+    elif sim.game_over and sim.frame != replay.game_over_frame:
+        problems.append(f"game over at frame {sim.frame}; recorded at frame {replay.game_over_frame}")
+    if sim.score != replay.final_score:
+        problems.append(f"score {sim.score}, recorded {replay.final_score}")
+    if sim.hits_avoided != replay.hits_avoided:
+        problems.append(f"hits avoided {sim.hits_avoided}, recorded {replay.hits_avoided}")
+    if state_hash(sim) != replay.final_hash:
+        problems.append("final state differs from the recording")
+    return problems
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Fast-forward a DodgeMaster++ replay")
+    parser.add_argument("path")
+    args = parser.parse_args()
+
+    replay = load_replay(args.path)
+    start = time.perf_counter()
+    sim = play_replay(replay)
+    elapsed = time.perf_counter() - start
+    problems = check_replay(replay, sim)
+    status = "match" if not problems else "MISMATCH: " + "; ".join(problems)
+    print(f"frames={sim.frame} score={sim.score} {status} in {elapsed:.2f}s")
+    raise SystemExit(1 if problems else 0)
@@ -0,0 +1,248 @@
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from utils import DATA_DIR
+
+SESSION_DB = os.path.join(DATA_DIR, "sessions.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    started REAL NOT NULL,
+    ended REAL,
+    seed INTEGER,
+    aggressiveness REAL,
+    player_speed REAL,
+    score INTEGER,
+    frames INTEGER,
+    hits_avoided INTEGER,
+    completed INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS events (
+    session_id INTEGER NOT NULL REFERENCES sessions(id),
+    timestamp REAL NOT NULL,
+    frame INTEGER,
+    event TEXT NOT NULL,
+    x_pos INTEGER,
+    y_pos INTEGER,
+    score INTEGER
+);
+CREATE INDEX IF NOT EXISTS events_session ON events(session_id);
+CREATE INDEX IF NOT EXISTS events_event ON events(event);
+CREATE TABLE IF NOT EXISTS scores (
+    session_id INTEGER PRIMARY KEY REFERENCES sessions(id),
+    score INTEGER NOT NULL,
+    ended REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scores_score ON scores(score);
+CREATE INDEX IF NOT EXISTS scores_ended ON scores(ended);
+CREATE TABLE IF NOT EXISTS score_counts (
+    score INTEGER PRIMARY KEY,
+    count INTEGER NOT NULL
+);
+"""
+
+class SessionStore:
+    # Game history in SQLite: one sessions row per game, its events, and the
+    # final score of every completed game. Like EventLogger, logging only
+    # queues events in memory; a background thread with its own connection
+    # inserts them in one transaction per flush_size events, every
+    # flush_interval seconds and when the game ends, so the game thread
+    # never waits on a commit mid-game. Queries use the caller's connection
+    # and first wait for queued writes to land.
+    # score_counts holds how many games ended on each score, so a rank is a
+    # sum over the distinct scores above it rather than a count over every
+    # game ever played.
+    def __init__(self, path=SESSION_DB, flush_size=512, flush_interval=1.0):
+        self.path = path
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=10)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.session_id = None
+        self.write_errors = 0
+        self._pending = []
+        self._lock = threading.Lock()
+        self._ops = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="session-store", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        while True:
+            try:
+                op = self._ops.get(timeout=self.flush_interval)
+            except queue.Empty:
+                # Idle: write whatever has been logged since the last batch
+                with self._lock:
+                    batch, self._pending = self._pending, []
+                if batch:
+                    self._apply(conn, ('events', batch))
+                continue
+            if op is None:
+                self._ops.task_done()
+                break
+            self._apply(conn, op)
+            self._ops.task_done()
+        conn.close()
+
+    def _apply(self, conn, op):
+        try:
+            with conn:
+                if op[0] == 'events':
+                    conn.executemany("INSERT INTO events VALUES (?, ?, ?, ?, ?, ?, ?)", op[1])
+                else:
+                    _, session_id, ended, score, frames, hits_avoided, completed = op
+                    conn.execute(
+                        "UPDATE sessions SET ended = ?, score = ?, frames = ?, hits_avoided = ?, completed = ? "
+                        "WHERE id = ?", (ended, score, frames, hits_avoided, int(completed), session_id))
+                    if completed and score is not None:
+                        conn.execute("INSERT INTO scores VALUES (?, ?, ?)", (session_id, score, ended))
+                        conn.execute("INSERT INTO score_counts VALUES (?, 1) "
+                                     "ON CONFLICT(score) DO UPDATE SET count = count + 1", (score,))
+        except sqlite3.Error as exc:
+            # Keep the writer alive; a lost batch only costs history
+            self.write_errors += 1
+            print(f"session store: write failed: {exc}", file=sys.stderr)
+
+    def _queue_pending(self):
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if batch:
+            self._ops.put(('events', batch))
+
+    def begin_session(self, seed=None, aggressiveness=None, player_speed=None):
+        if self.session_id is not None:
+            self.end_session(completed=False)
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO sessions (started, seed, aggressiveness, player_speed) VALUES (?, ?, ?, ?)",
+                (time.time(), seed, aggressiveness, player_speed))
+        self.session_id = cursor.lastrowid
+        return self.session_id
+
+    def log(self, event, x_pos, y_pos, score, frame=None):
+        # Only a list append on the caller's thread
+        if self.session_id is None:
+            return
+        with self._lock:
+            self._pending.append((self.session_id, time.time(), frame, event, x_pos, y_pos, score))
+            full = len(self._pending) >= self.flush_size
+        if full:
+            self._queue_pending()
+
+    def flush(self):
+        # Blocks until everything logged so far is written
+        self._queue_pending()
+        self._ops.join()
+
+    def end_session(self, score=None, frames=None, hits_avoided=None, completed=True):
+        # Closes the current session; a completed game's score joins the
+        # leaderboard once the writer gets to it. Returns the session id.
+        session_id = self.session_id
+        if session_id is None:
+            return None
+        self._queue_pending()
+        self._ops.put(('end', session_id, time.time(), score, frames, hits_avoided, completed))
+        self.session_id = None
+        return session_id
+
+    def rank(self, score):
+        # (rank, games) of a score among all completed games, 1 = best; ties share a rank
+        self._ops.join()
+        above, total = self.conn.execute(
+            "SELECT COALESCE(SUM(CASE WHEN score > ? THEN count END), 0), COALESCE(SUM(count), 0) "
+            "FROM score_counts", (score,)).fetchone()
+        return above + 1, total
+
+    def leaderboard(self, limit=10, since=None):
+        # Best completed games, optionally only those ended after `since` (epoch seconds)
+        self._ops.join()
+        query = ("SELECT s.id, scores.score, s.frames, scores.ended, s.aggressiveness, s.player_speed "
+                 "FROM scores JOIN sessions s ON s.id = scores.session_id")
+        params = []
+        if since is not None:
+            query += " WHERE scores.ended >= ?"
+            params.append(since)
+        query += " ORDER BY scores.score DESC LIMIT ?"
+        params.append(limit)
+        columns = ('session_id', 'score', 'frames', 'ended', 'aggressiveness', 'player_speed')
+        return [dict(zip(columns, row)) for row in self.conn.execute(query, params)]
+
+    def session_summary(self, session_id):
+        self._ops.join()
+        row = self.conn.execute(
+            "SELECT started, ended, seed, aggressiveness, player_speed, score, frames, hits_avoided, completed "
+            "FROM sessions WHERE id = ?", (session_id,)).fetchone()
+        if row is None:
+            return None
+        columns = ('started', 'ended', 'seed', 'aggressiveness', 'player_speed', 'score', 'frames',
+                   'hits_avoided', 'completed')
+        summary = dict(zip(columns, row))
+        summary['session_id'] = session_id
+        summary['completed'] = bool(summary['completed'])
+        summary['duration'] = summary['ended'] - summary['started'] if summary['ended'] else None
+        summary['events'] = dict(self.conn.execute(
+            "SELECT event, COUNT(*) FROM events WHERE session_id = ? GROUP BY event", (session_id,)))
+        return summary
+
+    def recent_sessions(self, limit=10):
+        ids = [row[0] for row in self.conn.execute("SELECT id FROM sessions ORDER BY id DESC LIMIT ?", (limit,))]
+        return [self.session_summary(session_id) for session_id in ids]
+
+    def close(self):
+        if self.conn is None:
+            return
+        if self.session_id is not None:
+            self.end_session(completed=False)
+        self._queue_pending()
+        self._ops.put(None)
+        self._thread.join()
+        self.conn.close()
+        self.conn = None
+
+if __name__ == "__main__":
+    import argparse
+    from datetime import datetime
+
+    parser = argparse.ArgumentParser(description="Query the recorded game sessions")
+    parser.add_argument("--db", default=SESSION_DB)
+    sub = parser.add_subparsers(dest="command", required=True)
+    board = sub.add_parser("leaderboard", help="best scores")
+    board.add_argument("--limit", type=int, default=10)
+    board.add_argument("--days", type=float, help="only games from the last DAYS days")
+    recent = sub.add_parser("sessions", help="recent sessions with their event counts")
+    recent.add_argument("--limit", type=int, default=10)
+    show = sub.add_parser("session", help="one session's summary")
+    show.add_argument("session_id", type=int)
+    args = parser.parse_args()
+
+    store = SessionStore(args.db)
+
+    def when(timestamp):
+        return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M") if timestamp else "-"
+
+    def describe(summary):
+        events = ", ".join(f"{name}={count}" for name, count in sorted(summary['events'].items())) or "no events"
+        status = "" if summary['completed'] else " (not finished)"
+        return (f"#{summary['session_id']} {when(summary['started'])} score={summary['score']} "
+                f"frames={summary['frames']}{status}: {events}")
+
+    if args.command == "leaderboard":
+        since = time.time() - args.days * 86400 if args.days else None
+        for place, entry in enumerate(store.leaderboard(args.limit, since), 1):
+            print(f"{place:>3}. {entry['score']:>7}  session #{entry['session_id']}  {when(entry['ended'])}")
+    elif args.command == "sessions":
+        for summary in store.recent_sessions(args.limit):
+            print(describe(summary))
+    else:
+        summary = store.session_summary(args.session_id)
+        print(describe(summary) if summary else f"no session #{args.session_id}")
+    store.close()
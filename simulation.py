@@ -0,0 +1,562 @@
+import pygame
+import random
+import math
+import sys
+import time
+import numpy as np
+from enum import Enum
+from projectiles import ProjectileStore
+from particles import ParticlePool
+from motion import MotionEstimator, MOTION_MODELS
+from gravity import GravityField
+from spawn_scheduler import SpawnScheduler
+from entities import EntityStore, round_half_away
+
+# Screen dimensions
+WIDTH, HEIGHT = 1000, 700
+
+# Colors
+WHITE = (255, 255, 255)
+GREEN = (0, 255, 0)
+RED = (255, 50, 50)
+BLUE = (50, 150, 255)
+BLACK = (0, 0, 0)
+YELLOW = (255, 255, 0)
+PURPLE = (150, 50, 255)
+ORANGE = (255, 165, 0)
+CYAN = (0, 255, 255)
+PINK = (255, 105, 180)
+LIGHT_GRAY = (200, 200, 200)
+DARK_GRAY = (100, 100, 100)
+
+# Event colors with transparency
+EVENT_COLORS = {
+    'RAIN_OF_FIRE': (255, 50, 50, 100),
+    'BLACK_HOLE': (0, 0, 0, 150),
+    'TIME_WARP': (150, 50, 255, 100)
+}
+
+# Power-Up types
+class PowerUpType(Enum):
+    SPEED_BOOST = 1
+    SHIELD = 2
+    TIME_SLOW = 3
+    MAGNET = 4
+
+# Special Event types
+class SpecialEvent(Enum):
+    RAIN_OF_FIRE = 1
+    MOVING_BLACK_HOLE = 2
+    TIME_WARP = 3
+
+POWERUP_COLORS = {
+    PowerUpType.SPEED_BOOST: ORANGE,
+    PowerUpType.SHIELD: CYAN,
+    PowerUpType.TIME_SLOW: PURPLE,
+    PowerUpType.MAGNET: YELLOW
+}
+POWERUP_TYPES = list(PowerUpType)
+POWERUP_SIZE = 20
+
+# Powerup entities: an integer 'body' box (pygame.Rect fields) and the
+# 'powerup' component (index into POWERUP_TYPES, pulse animation frame)
+POWERUP_COMPONENTS = {
+    'body': {'x': np.int64, 'y': np.int64, 'w': np.int64, 'h': np.int64},
+    'powerup': {'kind': np.int8, 'animation_timer': np.int64},
+}
+
+# Input bits passed to GameSimulator.step
+INPUT_LEFT = 1
+INPUT_RIGHT = 2
+INPUT_UP = 4
+INPUT_DOWN = 8
+
+class AIController:
+    # Difficulty tuning constants; instances may override them for sweeps
+    difficulty_score_scale = 5000
+    max_base_factor = 3
+    spawn_rate_start = 30
+    spawn_rate_floor = 10
+    spawn_rate_score_step = 500
+    prediction_base = 0.5
+    prediction_max = 0.9
+    prediction_score_scale = 10000
+
+    def __init__(self):
+        self.prediction_strength = self.prediction_base
+        self.aggressiveness = 1.0
+
+    def predict_player_position(self, motion, fallback):
+        if len(motion) < 2:
+            return fallback
+
+        dx, dy = motion.velocity()
+        dx *= self.aggressiveness
+        dy *= self.aggressiveness
+
+        last_pos = motion.last
+        predicted_x = last_pos[0] + dx * self.prediction_strength * 10
+        predicted_y = last_pos[1] + dy * self.prediction_strength * 10
+
+        return predicted_x, predicted_y
+
+    def adjust_difficulty(self, sim):
+        score, hits_avoided = sim.score, sim.hits_avoided
+
+        base_factor = min(1 + score / self.difficulty_score_scale, self.max_base_factor)
+        performance_factor = 1 + (1 - min(hits_avoided / max(score, 1), 1)) * 2
+
+        sim.enemy_speed = sim.base_enemy_speed * base_factor * performance_factor * 0.8 * self.aggressiveness * sim.time_warp_factor
+        sim.projectile_spawn_rate = max(self.spawn_rate_floor, self.spawn_rate_start - score // self.spawn_rate_score_step)
+        self.prediction_strength = min(self.prediction_max, self.prediction_base + score / self.prediction_score_scale)
+
+class GameSimulator:
+    # Owns all gameplay state and advances it one frame per step(), with no
+    # window or frame limiter. main.py renders from this state.
+    player_size = 30
+    enemy_size = 30
+    powerup_duration = 300  # frames (5 seconds at 60fps)
+    powerup_spawn_rate = 900  # frames (15 seconds)
+    special_event_duration = 480  # 8 seconds
+    black_hole_count = 1  # wells spawned by MOVING_BLACK_HOLE
+    spawn_budget = 40  # burst entities released per step (None = no limit)
+    invulnerable = False  # benchmarks: skip player hits (and their death bursts)
+
+    def __init__(self, seed=None, aggressiveness=1.0, player_speed=5, motion_model='mean', history_window=20):
+        self.rng = random.Random(seed)
+        self.player_motion = MotionEstimator(history_window, motion_model)
+        self.ai_controller = AIController()
+        self.ai_controller.aggressiveness = aggressiveness
+        self.default_player_speed = player_speed
+        self.particles = ParticlePool(seed=seed)
+        self.gravity = GravityField()
+        self.powerups = EntityStore(POWERUP_COMPONENTS)
+        # Optional FrameProfiler; step() times its phases while one is attached
+        self.profiler = None
+        # Event and powerup bursts, released a few entities per step
+        self.spawner = SpawnScheduler(self.spawn_budget)
+        # Optional pattern spawner (e.g. BulletHellDirector), updated every step
+        self.spawn_director = None
+        self.reset()
+
+    def reset(self, seed=None):
+        if seed is not None:
+            self.rng.seed(seed)
+
+        self.player = pygame.Rect(WIDTH // 2, HEIGHT // 2, self.player_size, self.player_size)
+        self.player_speed = self.default_player_speed
+        self.enemy = pygame.Rect(self.rng.randint(0, WIDTH - self.enemy_size), self.rng.randint(0, HEIGHT - self.enemy_size), self.enemy_size, self.enemy_size)
+        self.base_enemy_speed = 2
+        self.enemy_speed = self.base_enemy_speed
+
+        self.projectiles = ProjectileStore()
+        self.projectile_spawn_rate = self.ai_controller.spawn_rate_start
+        self.projectile_timer = 0
+        self.player_motion.reset()
+        self.ai_controller.prediction_strength = self.ai_controller.prediction_base
+
+        # Eye animation
+        self.player_eye_direction = [0, 1]
+        self.enemy_eye_direction = [0, 1]
+        self.last_enemy_x, self.last_enemy_y = 0, 0
+
+        # Power-Up state
+        self.powerups.clear()
+        self.powerup_timer = 0
+        self.active_powerup = None
+        self.powerup_active_time = 0
+        self.shield_active = False
+
+        # Special Event state
+        self.special_event_active = None
+        self.special_event_timer = 0
+        self.next_special_event_score = 600
+        self.gravity.clear()
+        self.time_warp_factor = 1.0
+
+        # Particle effects
+        self.particles.clear(seed)
+        self.spawner.clear()
+
+        self.score = 0
+        self.hits_avoided = 0
+        self.frame = 0
+        self.game_over = False
+
+        # (event, x, y) tuples produced by the latest step, for loggers
+        self.events = []
+
+    def set_settings(self, aggressiveness, player_speed):
+        self.ai_controller.aggressiveness = aggressiveness
+        self.default_player_speed = player_speed
+        self.player_speed = player_speed
+
+    def spawn_powerup(self, powerup_type=None):
+        if powerup_type is None:
+            powerup_type = self.rng.choice(POWERUP_TYPES)
+        x = self.rng.randint(50, WIDTH - 50)
+        y = self.rng.randint(50, HEIGHT - 50)
+        return self.powerups.create(x=x, y=y, w=POWERUP_SIZE, h=POWERUP_SIZE,
+                                    kind=POWERUP_TYPES.index(powerup_type), animation_timer=0)
+
+    def powerup_centers(self):
+        # Integer centers, as pygame.Rect.center
+        p = self.powerups
+        n = p.count
+        return p.x[:n] + p.w[:n] // 2, p.y[:n] + p.h[:n] // 2
+
+    def powerups_overlapping(self, rect):
+        # Slots of the powerups overlapping rect, with pygame.Rect.colliderect edges
+        p = self.powerups
+        n = p.count
+        x, y = p.x[:n], p.y[:n]
+        return np.flatnonzero((x < rect[0] + rect[2]) & (x + p.w[:n] > rect[0]) &
+                              (y < rect[1] + rect[3]) & (y + p.h[:n] > rect[1]))
+
+    def powerups_within(self, cx, cy, radius):
+        # Slots of the powerups whose centers lie strictly within radius of (cx, cy)
+        p = self.powerups
+        n = p.count
+        dx = p.x[:n] + p.w[:n] / 2 - cx
+        dy = p.y[:n] + p.h[:n] / 2 - cy
+        return np.flatnonzero(dx*dx + dy*dy < radius * radius)
+
+    def move_powerups(self, slots, dx, dy):
+        # Shift powerups by float offsets, rounding like pygame.Rect fields
+        p = self.powerups
+        p.x[slots] = round_half_away(p.x[slots] + dx)
+        p.y[slots] = round_half_away(p.y[slots] + dy)
+
+    def activate_powerup(self, powerup_id):
+        powerups = self.powerups
+        slot = powerups.slot(powerup_id)
+        powerup_type = POWERUP_TYPES[powerups.kind[slot]]
+        cx, cy = self.powerup_centers()
+        self.active_powerup = powerup_type
+        self.powerup_active_time = 0
+        self.events.append(('powerup', int(cx[slot]), int(cy[slot])))
+
+        if self.active_powerup == PowerUpType.SPEED_BOOST:
+            self.player_speed *= 1.5
+        elif self.active_powerup == PowerUpType.SHIELD:
+            self.shield_active = True
+        elif self.active_powerup == PowerUpType.TIME_SLOW:
+            self.base_enemy_speed *= 0.5
+            self.enemy_speed *= 0.5
+            self.projectiles.scale_velocity(0.5)
+        elif self.active_powerup == PowerUpType.MAGNET:
+            # Attract nearby powerups
+            idx = self.powerups_within(self.player.centerx, self.player.centery, 200)  # Magnet range
+            if idx.size:
+                self.move_powerups(idx, (self.player.centerx - cx[idx]) * 0.05, (self.player.centery - cy[idx]) * 0.05)
+                cx, cy = self.powerup_centers()
+
+        self.spawner.particles(self.frame, *self.particles.burst_columns(int(cx[slot]), int(cy[slot]), 50),
+                               POWERUP_COLORS[powerup_type])
+
+    def deactivate_powerup(self):
+        if self.active_powerup == PowerUpType.SPEED_BOOST:
+            self.player_speed = self.default_player_speed
+        elif self.active_powerup == PowerUpType.SHIELD:
+            self.shield_active = False
+        elif self.active_powerup == PowerUpType.TIME_SLOW:
+            self.base_enemy_speed = 2
+            self.enemy_speed = self.base_enemy_speed * self.ai_controller.aggressiveness
+
+        self.active_powerup = None
+
+    def spawn_special_event(self, event_type=None):
+        rng = self.rng
+        if event_type is None:
+            event_type = rng.choice(list(SpecialEvent))
+        self.special_event_active = event_type
+        self.special_event_timer = 0
+        self.events.append(('special_event', self.player.centerx, self.player.centery))
+
+        # Create visual effect particles
+        if event_type == SpecialEvent.RAIN_OF_FIRE:
+            # Spawn 30 projectiles from top
+            rain = [(rng.randint(0, WIDTH), rng.uniform(-1, 1), rng.uniform(2, 5)) for _ in range(30)]
+            x, dx, dy = zip(*rain)
+            self.spawner.projectiles(self.frame, x, np.zeros(30), dx, dy)
+            # Red rain particles
+            prng = self.particles.rng
+            self.spawner.particles(self.frame, prng.integers(0, WIDTH + 1, 100), prng.integers(-50, 1, 100),
+                                   prng.uniform(-1, 1, 100), prng.uniform(2, 5, 100),
+                                   prng.integers(2, 7, 100), prng.integers(60, 121, 100),
+                                   EVENT_COLORS['RAIN_OF_FIRE'])
+        elif event_type == SpecialEvent.MOVING_BLACK_HOLE:
+            # A new black hole event replaces the wells of any earlier one
+            self.gravity.clear()
+            for _ in range(self.black_hole_count):
+                self.spawn_black_hole()
+
+    def spawn_black_hole(self):
+        # Add a gravity well that drifts across the screen from a random side
+        rng = self.rng
+        start_side = rng.choice(['top', 'bottom', 'left', 'right'])
+        if start_side == 'top':
+            x, y = rng.randint(100, WIDTH-100), -50
+            dx, dy = rng.uniform(-1, 1), rng.uniform(1, 2)
+        elif start_side == 'bottom':
+            x, y = rng.randint(100, WIDTH-100), HEIGHT+50
+            dx, dy = rng.uniform(-1, 1), rng.uniform(-2, -1)
+        elif start_side == 'left':
+            x, y = -50, rng.randint(100, HEIGHT-100)
+            dx, dy = rng.uniform(1, 2), rng.uniform(-1, 1)
+        else:  # right
+            x, y = WIDTH+50, rng.randint(100, HEIGHT-100)
+            dx, dy = rng.uniform(-2, -1), rng.uniform(-1, 1)
+
+        self.gravity.add(x, y, dx, dy, radius=40, strength=0.7, reach=300)
+
+        # Create swirling particles
+        prng = self.particles.rng
+        angle = prng.uniform(0, 2*math.pi, 50)
+        dist = prng.uniform(30, 100, 50)
+        self.spawner.particles(self.frame, x + np.cos(angle) * dist, y + np.sin(angle) * dist,
+                               np.sin(angle) * 2 + dx, -np.cos(angle) * 2 + dy,
+                               prng.integers(2, 5, 50), prng.integers(90, 181, 50),
+                               EVENT_COLORS['BLACK_HOLE'])
+
+    def end_special_event(self):
+        if self.special_event_active == SpecialEvent.MOVING_BLACK_HOLE:
+            self.gravity.clear()
+        elif self.special_event_active == SpecialEvent.TIME_WARP:
+            self.time_warp_factor = 1.0
+
+        self.special_event_active = None
+
+    def apply_gravity_field(self):
+        gravity = self.gravity
+        gravity.move(self.time_warp_factor, WIDTH, HEIGHT)
+        if not len(gravity):
+            return
+
+        # Affect player with stronger close-range pull
+        player = self.player
+        fx, fy = gravity.pull_point(player.centerx, player.centery, 3)
+        player.x += fx
+        player.y += fy
+
+        # Projectiles and powerups are pulled in one batch
+        projectiles = self.projectiles
+        n = projectiles.count
+        cx, cy = projectiles.centers()
+        gain = np.full(n + len(self.powerups), 0.015)
+        gain[:n] = 0.02
+        if len(self.powerups):
+            powerup_x, powerup_y = self.powerup_centers()
+            cx = np.concatenate((cx, powerup_x))
+            cy = np.concatenate((cy, powerup_y))
+        if not gain.size:
+            return
+        fx, fy = gravity.pull(cx, cy, gain)
+        projectiles.x[:n] += fx[:n]
+        projectiles.y[:n] += fy[:n]
+        if len(self.powerups):
+            self.move_powerups(slice(0, len(self.powerups)), fx[n:], fy[n:])
+
+    def edge_point(self, side=None):
+        # Random point on the given (or a random) screen edge
+        rng = self.rng
+        if side is None:
+            side = rng.choice(['top', 'bottom', 'left', 'right'])
+        if side == 'top':
+            return rng.randint(0, WIDTH), 0
+        elif side == 'bottom':
+            return rng.randint(0, WIDTH), HEIGHT
+        elif side == 'left':
+            return 0, rng.randint(0, HEIGHT)
+        return WIDTH, rng.randint(0, HEIGHT)
+
+    def aim_target(self):
+        # Where projectiles are aimed: the AI's predicted player position
+        if len(self.player_motion) > 5:
+            return self.ai_controller.predict_player_position(self.player_motion, self.player.center)
+        return self.player.center
+
+    def spawn_projectile(self):
+        rng = self.rng
+        side = rng.choice(['top', 'bottom', 'left', 'right'])
+        speed = rng.uniform(2.0, 5.0) * (1 + self.ai_controller.aggressiveness) * self.time_warp_factor
+        x, y = self.edge_point(side)
+
+        target_x, target_y = self.aim_target()
+        angle = math.atan2(target_y - y, target_x - x)
+        self.projectiles.add(x, y, math.cos(angle) * speed, math.sin(angle) * speed)
+
+    def move_player(self, inputs):
+        player = self.player
+        speed = self.player_speed * self.time_warp_factor
+        if inputs & INPUT_LEFT:
+            player.x -= speed
+            self.player_eye_direction = [-1, 0]
+        if inputs & INPUT_RIGHT:
+            player.x += speed
+            self.player_eye_direction = [1, 0]
+        if inputs & INPUT_UP:
+            player.y -= speed
+            self.player_eye_direction = [0, -1]
+        if inputs & INPUT_DOWN:
+            player.y += speed
+            self.player_eye_direction = [0, 1]
+        player.clamp_ip(pygame.Rect(0, 0, WIDTH, HEIGHT))
+
+    def move_enemy(self):
+        enemy = self.enemy
+        predicted_x, predicted_y = self.ai_controller.predict_player_position(self.player_motion, self.player.center)
+        angle = math.atan2(predicted_y - enemy.centery, predicted_x - enemy.centerx)
+        enemy.x += int(math.cos(angle) * self.enemy_speed * self.time_warp_factor)
+        enemy.y += int(math.sin(angle) * self.enemy_speed * self.time_warp_factor)
+
+        self.enemy_eye_direction = [enemy.x - self.last_enemy_x, enemy.y - self.last_enemy_y]
+        self.last_enemy_x, self.last_enemy_y = enemy.x, enemy.y
+
+    def update_projectiles(self):
+        self.projectiles.move(self.time_warp_factor)
+        culled = self.projectiles.cull(-50, -50, WIDTH + 50, HEIGHT + 50)
+        if culled:
+            self.hits_avoided += culled
+            self.events.extend([('missed', self.player.centerx, self.player.centery)] * culled)
+
+    def check_collisions(self):
+        player = self.player
+        if self.invulnerable:
+            return
+        # One rect against every projectile: a single vectorized pass
+        if not self.shield_active and self.projectiles.any_overlapping(player):
+            self.particles.burst(player.centerx, player.centery, RED, 30)
+            self.game_over = True
+
+        if player.colliderect(self.enemy):
+            self.particles.burst(player.centerx, player.centery, RED, 30)
+            self.game_over = True
+
+        if self.game_over:
+            self.events.append(('hit', player.centerx, player.centery))
+
+    def step(self, inputs=0):
+        self.events.clear()
+        prof = self.profiler
+
+        # Update particles
+        self.particles.update()
+
+        if prof:
+            prof.lap('update_particles')
+
+        # Powerup spawning
+        self.powerup_timer += 1
+        if self.powerup_timer >= self.powerup_spawn_rate:
+            self.spawn_powerup()
+            self.powerup_timer = 0
+
+        # Update active powerup timer
+        if self.active_powerup:
+            self.powerup_active_time += 1
+            if self.powerup_active_time >= self.powerup_duration:
+                self.deactivate_powerup()
+
+        # Check for powerup collisions
+        if len(self.powerups):
+            hits = self.powerups_overlapping(self.player)
+            if hits.size:
+                powerup_id = int(self.powerups.id[hits[0]])
+                self.activate_powerup(powerup_id)
+                self.powerups.remove(powerup_id)
+
+        if prof:
+            prof.lap('powerups')
+
+        # Check for special event triggering
+        if self.score >= self.next_special_event_score:
+            self.spawn_special_event()
+            self.next_special_event_score += 600  # Set next threshold
+
+        # Update special event timer
+        if self.special_event_active:
+            self.special_event_timer += 1
+            if self.special_event_timer >= self.special_event_duration:
+                self.end_special_event()
+
+        if prof:
+            prof.lap('special_events')
+
+        # Release queued burst entities within this step's budget
+        spawner = self.spawner
+        spawner.update(self)
+        if prof:
+            prof.lap('spawn_scheduler')
+            prof.gauge('spawn queue', spawner.pending)
+            prof.gauge('released', f"{spawner.released}/{spawner.budget}")
+
+        # Apply black hole gravity if any wells are active
+        if len(self.gravity):
+            self.apply_gravity_field()
+            if prof:
+                prof.lap('apply_gravity_field')
+
+        # Player movement
+        self.move_player(inputs)
+
+        # Record player position for AI
+        self.player_motion.append((self.player.centerx, self.player.centery))
+
+        # AI-controlled enemy movement
+        self.move_enemy()
+
+        if prof:
+            prof.lap('movement')
+
+        # Projectile spawning
+        self.projectile_timer += 1
+        if self.projectile_timer >= self.projectile_spawn_rate:
+            self.spawn_projectile()
+            self.projectile_timer = 0
+        if self.spawn_director:
+            self.spawn_director.update(self)
+
+        # Update projectiles
+        self.update_projectiles()
+
+        if prof:
+            prof.lap('update_projectiles')
+
+        # Collision detection
+        self.check_collisions()
+        if prof:
+            prof.lap('check_collisions')
+
+        # Update score and difficulty
+        self.score += 1
+        self.frame += 1
+        self.ai_controller.adjust_difficulty(self)
+        if prof:
+            prof.lap('adjust_difficulty')
+
+def run_headless(frames, seed=None, policy=None, aggressiveness=1.0, player_speed=5, motion_model='mean'):
+    # Runs one episode without a window; policy(sim) returns the input bits
+    sim = GameSimulator(seed=seed, aggressiveness=aggressiveness, player_speed=player_speed, motion_model=motion_model)
+    while sim.frame < frames and not sim.game_over:
+        sim.step(policy(sim) if policy else 0)
+    return sim
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run DodgeMaster++ headless")
+    parser.add_argument("--frames", type=int, default=36000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--aggressiveness", type=float, default=1.0)
+    parser.add_argument("--player-speed", type=float, default=5)
+    parser.add_argument("--motion-model", choices=MOTION_MODELS, default='mean')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    sim = run_headless(args.frames, args.seed, aggressiveness=args.aggressiveness,
+                       player_speed=args.player_speed, motion_model=args.motion_model)
+    elapsed = time.perf_counter() - start
+    print(f"frames={sim.frame} score={sim.score} hits_avoided={sim.hits_avoided} "
+          f"game_over={sim.game_over} fps={sim.frame / max(elapsed, 1e-9):.0f}")
+    sys.exit(0)
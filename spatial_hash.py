@@ -0,0 +1,73 @@
+import numpy as np
+
+class SpatialHash:
+    # Uniform grid over the playfield, rebuilt from AABB arrays with a counting
+    # sort: cell indices are uint16 whenever the grid has few enough cells,
+    # and numpy's stable sort is a radix sort for 16-bit keys. Each entity is
+    # filed under the cell holding its top-left corner and queries widen by
+    # the largest entity size, so no entity is stored twice. Entities outside
+    # the playfield are clamped into the border cells.
+    # A build only pays for itself over many queries; testing one rect is
+    # cheaper as a single vectorized pass over the arrays.
+    def __init__(self, width, height, cell_size=50):
+        self.cell_size = cell_size
+        self.cols = max(1, -(-width // cell_size))
+        self.rows = max(1, -(-height // cell_size))
+        self.cell_dtype = np.uint16 if self.cols * self.rows <= 1 << 16 else np.intp
+        self.count = 0
+        self.max_w = self.max_h = 0.0
+        self.x = self.y = self.w = self.h = np.zeros(0)
+        self.order = np.zeros(0, dtype=np.intp)
+        self.cell_start = np.zeros(self.cols * self.rows + 1, dtype=np.intp)
+
+    def _col(self, x):
+        return np.clip(np.floor_divide(x, self.cell_size), 0, self.cols - 1).astype(np.intp)
+
+    def _row(self, y):
+        return np.clip(np.floor_divide(y, self.cell_size), 0, self.rows - 1).astype(np.intp)
+
+    def _cell(self, v, limit):
+        # Scalar version of _col/_row for query bounds
+        return min(max(int(v // self.cell_size), 0), limit - 1)
+
+    def build(self, x, y, w, h):
+        self.x, self.y, self.w, self.h = x, y, w, h
+        self.count = n = len(x)
+        if n:
+            self.max_w, self.max_h = float(w.max()), float(h.max())
+            cells = (self._row(y) * self.cols + self._col(x)).astype(self.cell_dtype)
+            self.order = np.argsort(cells, kind='stable')
+            counts = np.bincount(cells, minlength=self.cols * self.rows)
+            self.cell_start[1:] = np.cumsum(counts)
+        else:
+            self.order = self.order[:0]
+            self.cell_start[:] = 0
+
+    def _candidates(self, left, top, right, bottom):
+        # Entities whose top-left cell could overlap [left, right] x [top, bottom]
+        if not self.count:
+            return self.order
+        c0, c1 = self._cell(left - self.max_w, self.cols), self._cell(right, self.cols)
+        r0, r1 = self._cell(top - self.max_h, self.rows), self._cell(bottom, self.rows)
+        starts = self.cell_start
+        slices = [self.order[starts[r * self.cols + c0]:starts[r * self.cols + c1 + 1]] for r in range(r0, r1 + 1)]
+        return slices[0] if len(slices) == 1 else np.concatenate(slices)
+
+    def query_rect(self, rect):
+        # Indices of entities overlapping rect, with pygame.Rect.colliderect edges
+        rx, ry, rw, rh = rect
+        idx = self._candidates(rx, ry, rx + rw, ry + rh)
+        if not idx.size:
+            return idx
+        x, y = self.x[idx], self.y[idx]
+        hit = (x < rx + rw) & (x + self.w[idx] > rx) & (y < ry + rh) & (y + self.h[idx] > ry)
+        return idx[hit]
+
+    def query_radius(self, cx, cy, radius):
+        # Indices of entities whose centers lie strictly within radius of (cx, cy)
+        idx = self._candidates(cx - radius, cy - radius, cx + radius, cy + radius)
+        if not idx.size:
+            return idx
+        dx = self.x[idx] + self.w[idx] / 2 - cx
+        dy = self.y[idx] + self.h[idx] / 2 - cy
+        return idx[dx*dx + dy*dy < radius * radius]
@@ -0,0 +1,91 @@
+from collections import deque
+import numpy as np
+
+# Spreads bursts of projectiles and particles over several steps. A burst is
+# generated in full when it is scheduled (so random draws happen in the same
+# order as before) and queued as a wave; each step releases at most `budget`
+# entities: projectile waves first, since they are gameplay rather than
+# effects, then oldest wave first. An entity released `late` steps after it
+# was scheduled is moved on by its velocity for those steps and, for
+# particles, has that much life taken off, so the burst keeps the shape it
+# would have had if it had all spawned at once.
+
+class Wave:
+    def __init__(self, kind, frame, columns, color=None):
+        self.kind = kind
+        self.frame = frame
+        self.columns = columns
+        self.color = color
+        self.size = len(columns['x'])
+        self.cursor = 0
+
+class SpawnScheduler:
+    def __init__(self, budget=40):
+        self.budget = budget
+        self.queues = {'projectiles': deque(), 'particles': deque()}
+        self.pending = 0
+        self.released = 0  # entities released by the latest update
+        self.peak_pending = 0
+
+    def clear(self):
+        for queue in self.queues.values():
+            queue.clear()
+        self.pending = 0
+        self.released = 0
+
+    def _queue(self, wave):
+        if wave.size:
+            self.queues[wave.kind].append(wave)
+            self.pending += wave.size
+            self.peak_pending = max(self.peak_pending, self.pending)
+
+    def projectiles(self, frame, x, y, dx, dy):
+        self._queue(Wave('projectiles', frame, {'x': np.asarray(x, dtype=np.float64),
+                                                'y': np.asarray(y, dtype=np.float64),
+                                                'dx': np.asarray(dx, dtype=np.float64),
+                                                'dy': np.asarray(dy, dtype=np.float64)}))
+
+    def particles(self, frame, x, y, dx, dy, size, life, color):
+        self._queue(Wave('particles', frame, {'x': np.asarray(x), 'y': np.asarray(y),
+                                              'dx': np.asarray(dx), 'dy': np.asarray(dy),
+                                              'size': np.asarray(size), 'life': np.asarray(life)}, color))
+
+    def update(self, sim):
+        # Releases up to `budget` queued entities (everything when budget is None)
+        if not self.pending:
+            self.released = 0
+            return
+        budget = self.pending if self.budget is None else self.budget
+        released = 0
+        for queue in self.queues.values():
+            while queue and released < budget:
+                wave = queue[0]
+                take = min(budget - released, wave.size - wave.cursor)
+                part = {name: column[wave.cursor:wave.cursor + take] for name, column in wave.columns.items()}
+                wave.cursor += take
+                released += take
+                if wave.cursor == wave.size:
+                    queue.popleft()
+                self._release(sim, wave, part, sim.frame - wave.frame)
+        self.pending -= released
+        self.released = released
+
+    def _release(self, sim, wave, part, late):
+        x, y, dx, dy = part['x'], part['y'], part['dx'], part['dy']
+        if wave.kind == 'projectiles':
+            if late:
+                x = x + dx * late * sim.time_warp_factor
+                y = y + dy * late * sim.time_warp_factor
+            sim.projectiles.add_many(x, y, dx, dy)
+            return
+        life = part['life']
+        if late:
+            alive = life > late
+            x = x[alive] + dx[alive] * late
+            y = y[alive] + dy[alive] * late
+            dx, dy, life = dx[alive], dy[alive], life[alive] - late
+            size = part['size'][alive]
+        else:
+            size = part['size']
+        if len(life):
+            sim.particles.add_many(x, y, dx, dy, size, life, wave.color)
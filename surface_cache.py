@@ -0,0 +1,56 @@
+from collections import OrderedDict
+
+ALPHA_LEVELS = 16
+
+def quantize_alpha(alpha, levels=ALPHA_LEVELS):
+    # Snap 0-255 alpha to one of `levels` values so fades and pulses reuse
+    # a handful of cached surfaces instead of one per frame
+    step = 255 / (levels - 1)
+    return int(round(max(0, min(255, alpha)) / step) * step)
+
+class SurfaceCache:
+    # LRU cache of pre-rendered effect surfaces, bounded by pixel memory.
+    # get(key, build) returns the cached surface for key, calling build()
+    # to create it on a miss. Callers must not draw onto returned surfaces.
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._surfaces = OrderedDict()
+
+    def get(self, key, build):
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = build()
+        self._surfaces[key] = surface
+        self.bytes += self._size(surface)
+        while self.bytes > self.max_bytes and len(self._surfaces) > 1:
+            _, evicted = self._surfaces.popitem(last=False)
+            self.bytes -= self._size(evicted)
+            self.evictions += 1
+        return surface
+
+    def _size(self, surface):
+        return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+    def clear(self):
+        self._surfaces.clear()
+        self.bytes = 0
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._surfaces),
+            'bytes': self.bytes,
+            'hit_rate': self.hits / total if total else 0.0
+        }
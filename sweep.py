@@ -0,0 +1,131 @@
+import csv
+import itertools
+import multiprocessing
+import os
+import time
+from simulation import GameSimulator, AIController
+from bots import make_policy, POLICIES
+
+RESULT_FIELDS = ["aggressiveness", "player_speed", "overrides", "bot", "seed", "survival_frames",
+                 "score", "hits_avoided", "max_projectiles", "mean_projectiles", "game_over"]
+
+def parse_range(spec):
+    # "1.0" -> [1.0], "0.5,1,2" -> [0.5, 1.0, 2.0], "0.1:2.0:0.1" -> inclusive range
+    if ":" in spec:
+        start, stop, step = (float(v) for v in spec.split(":"))
+        count = int(round((stop - start) / step)) + 1
+        return [round(start + i * step, 6) for i in range(count)]
+    return [float(v) for v in spec.split(",")]
+
+def parse_overrides(pairs):
+    overrides = {}
+    for pair in pairs:
+        name, _, value = pair.partition("=")
+        if not hasattr(AIController, name):
+            raise ValueError(f"AIController has no tuning constant {name!r}")
+        overrides[name] = float(value)
+    return overrides
+
+def run_episode(task):
+    aggressiveness, player_speed, overrides, bot, seed, max_frames = task
+    sim = GameSimulator(seed=seed, aggressiveness=aggressiveness, player_speed=player_speed)
+    for name, value in overrides:
+        setattr(sim.ai_controller, name, value)
+    sim.reset(seed=seed)
+    policy = make_policy(bot, seed)
+
+    max_projectiles = 0
+    projectile_frames = 0
+    while sim.frame < max_frames and not sim.game_over:
+        sim.step(policy(sim))
+        count = sim.projectiles.count
+        projectile_frames += count
+        if count > max_projectiles:
+            max_projectiles = count
+
+    return {
+        "aggressiveness": aggressiveness,
+        "player_speed": player_speed,
+        "overrides": ";".join(f"{name}={value:g}" for name, value in overrides),
+        "bot": bot,
+        "seed": seed,
+        "survival_frames": sim.frame,
+        "score": sim.score,
+        "hits_avoided": sim.hits_avoided,
+        "max_projectiles": max_projectiles,
+        "mean_projectiles": round(projectile_frames / max(sim.frame, 1), 3),
+        "game_over": sim.game_over,
+    }
+
+def build_tasks(aggressiveness_values, speed_values, override_sets=({},), bot="dodge", episodes=8, max_frames=36000, base_seed=0):
+    # Every configuration is played with the same seeds so results are comparable
+    tasks = []
+    for aggressiveness, player_speed, overrides in itertools.product(aggressiveness_values, speed_values, override_sets):
+        for episode in range(episodes):
+            tasks.append((aggressiveness, player_speed, tuple(sorted(overrides.items())), bot, base_seed + episode, max_frames))
+    return tasks
+
+def run_sweep(tasks, processes=None, chunksize=None):
+    processes = processes or os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(1, len(tasks) // (processes * 8))
+    if processes == 1:
+        return [run_episode(task) for task in tasks]
+    with multiprocessing.Pool(processes) as pool:
+        return list(pool.imap_unordered(run_episode, tasks, chunksize))
+
+def write_results(results, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    results = sorted(results, key=lambda r: (r["aggressiveness"], r["player_speed"], r["overrides"], r["seed"]))
+    with open(path, mode="w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=RESULT_FIELDS)
+        writer.writeheader()
+        writer.writerows(results)
+
+def summarize(results):
+    groups = {}
+    for r in results:
+        groups.setdefault((r["aggressiveness"], r["player_speed"], r["overrides"]), []).append(r)
+    rows = []
+    for (aggressiveness, player_speed, overrides), group in sorted(groups.items()):
+        n = len(group)
+        rows.append({
+            "aggressiveness": aggressiveness,
+            "player_speed": player_speed,
+            "overrides": overrides,
+            "episodes": n,
+            "mean_survival_frames": sum(r["survival_frames"] for r in group) / n,
+            "mean_score": sum(r["score"] for r in group) / n,
+            "mean_hits_avoided": sum(r["hits_avoided"] for r in group) / n,
+            "max_projectiles": max(r["max_projectiles"] for r in group),
+        })
+    return rows
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Sweep AIController difficulty settings over headless bot episodes")
+    parser.add_argument("--aggressiveness", default="0.1:2.0:0.1", help="value, comma list or start:stop:step")
+    parser.add_argument("--player-speed", default="3:10:1", help="value, comma list or start:stop:step")
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE",
+                        help="override an AIController tuning constant, e.g. spawn_rate_floor=8")
+    parser.add_argument("--bot", choices=sorted(POLICIES), default="dodge")
+    parser.add_argument("--episodes", type=int, default=8)
+    parser.add_argument("--frames", type=int, default=36000, help="frame cap per episode (36000 = 10 minutes)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--out", default="data/sweep_results.csv")
+    args = parser.parse_args()
+
+    tasks = build_tasks(parse_range(args.aggressiveness), parse_range(args.player_speed),
+                        [parse_overrides(args.set)], args.bot, args.episodes, args.frames, args.seed)
+    start = time.perf_counter()
+    results = run_sweep(tasks, args.processes)
+    elapsed = time.perf_counter() - start
+    write_results(results, args.out)
+
+    print(f"{'aggr':>6} {'speed':>6} {'survival':>10} {'score':>10} {'avoided':>8} {'max proj':>9}")
+    for row in summarize(results):
+        print(f"{row['aggressiveness']:>6.2f} {row['player_speed']:>6.1f} {row['mean_survival_frames']:>10.0f} "
+              f"{row['mean_score']:>10.0f} {row['mean_hits_avoided']:>8.1f} {row['max_projectiles']:>9d}")
+    print(f"{len(tasks)} episodes in {elapsed:.1f}s, results written to {args.out}")
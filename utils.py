@@ -1,18 +1,120 @@
+import atexit
 import csv
 from datetime import datetime
 import os
+import sys
+import threading
+import time
 
 DATA_DIR = "data"
 LOG_FILE = os.path.join(DATA_DIR, "game_log.csv")
+LOG_HEADER = ["timestamp", "event", "x_pos", "y_pos", "score"]
 
-def init_log():
+class EventLogger:
+    # Queues events in memory and appends them to the CSV log in batches from
+    # a background thread. A batch is written once flush_size events are
+    # queued or flush_interval seconds have passed, whichever comes first.
+    # When the log grows past max_bytes it is rotated to game_log.1.csv,
+    # game_log.2.csv, ... keeping backup_count old segments.
+    def __init__(self, path=LOG_FILE, flush_size=512, flush_interval=1.0, max_bytes=10 * 1024 * 1024, backup_count=5):
+        self.path = path
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.written = 0
+        self.write_errors = 0
+        self._pending = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="event-logger", daemon=True)
+        self._thread.start()
+
+    def log(self, event, x_pos, y_pos, score):
+        # Only a list append on the caller's thread; timestamps are formatted at flush
+        with self._lock:
+            self._pending.append((time.time(), event, x_pos, y_pos, score))
+            full = len(self._pending) >= self.flush_size
+        if full:
+            self._wake.set()
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as exc:
+                # Keep the thread alive; the failed batch is dropped
+                self.write_errors += 1
+                print(f"event log: write failed: {exc!r}", file=sys.stderr)
+
+    def flush(self):
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return
+        with self._write_lock:
+            self._write(batch)
+            self.written += len(batch)
+
+    def _write(self, batch):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        with open(self.path, mode="a", newline="") as file:
+            writer = csv.writer(file)
+            if new_file:
+                writer.writerow(LOG_HEADER)
+            writer.writerows([datetime.fromtimestamp(t).isoformat(), event, x_pos, y_pos, score]
+                             for t, event, x_pos, y_pos, score in batch)
+            size = file.tell()
+        if size >= self.max_bytes:
+            self._rotate()
+
+    def _rotate(self):
+        root, ext = os.path.splitext(self.path)
+        for i in range(self.backup_count - 1, 0, -1):
+            src = f"{root}.{i}{ext}"
+            if os.path.exists(src):
+                os.replace(src, f"{root}.{i + 1}{ext}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{root}.1{ext}")
+        else:
+            os.remove(self.path)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._thread.join()
+        self.flush()
+
+_logger = None
+
+def init_log(binary=False, **options):
+    # Appends to the existing log across sessions; the header is written once.
+    # binary=True writes binlog segments under data/game_log/ instead.
+    global _logger
     os.makedirs(DATA_DIR, exist_ok=True)
-    with open(LOG_FILE, mode="w", newline="") as file:
-        writer = csv.writer(file)
-        writer.writerow(["timestamp", "event", "x_pos", "y_pos", "score"])
+    if _logger is None:
+        if binary:
+            from binlog import BinaryEventLogger
+            _logger = BinaryEventLogger(**options)
+        else:
+            _logger = EventLogger(**options)
+        atexit.register(close_log)
+    return _logger
 
 def log_event(event, x_pos, y_pos, score):
-    timestamp = datetime.now().isoformat()
-    with open(LOG_FILE, mode="a", newline="") as file:
-        writer = csv.writer(file)
-        writer.writerow([timestamp, event, x_pos, y_pos, score])
+    if _logger is None:
+        init_log()
+    _logger.log(event, x_pos, y_pos, score)
+
+def close_log():
+    global _logger
+    if _logger is not None:
+        _logger.close()
+        _logger = None
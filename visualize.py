@@ -1,13 +1,24 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import html
+import os
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
+from binlog import LOG_DIR, is_binary_log, read_log, iter_segments, to_frame, event_names
 
-def analyze_game_log(filepath="data/game_log.csv"):
-    df = pd.read_csv(filepath)
+def analyze_game_log(filepath="data/game_log.csv", streaming=False, chunksize=1_000_000, max_points=2000):
+    if streaming:
+        stats = stream_game_log(filepath, chunksize, max_points)
+        plot_log_stats(stats, os.path.dirname(filepath) or ".")
+        return stats
+
+    df = to_frame(read_log(filepath)) if is_binary_log(filepath) else pd.read_csv(filepath)
     print(df.head())
 
     plt.figure(figsize=(10, 5))
-    score_over_time = df[df['event'] == 'missed']
-    plt.plot(score_over_time['score'], label='Score over time', color='blue')
+    score_over_time = df.loc[df['event'] == 'missed', 'score']
+    xs, ys = lttb(score_over_time.index.to_numpy(), score_over_time.to_numpy(), max_points)
+    plt.plot(xs, ys, label='Score over time', color='blue')
     plt.title("Score Progression")
     plt.xlabel("Time Step")
     plt.ylabel("Score")
@@ -18,6 +29,7 @@ def analyze_game_log(filepath="data/game_log.csv"):
     plt.show()
 
     event_counts = df['event'].value_counts()
+    event_counts = event_counts[event_counts > 0]
     plt.figure()
     event_counts.plot(kind='bar', color=['green', 'red'])
     plt.title("Event Frequency")
@@ -25,3 +37,263 @@ def analyze_game_log(filepath="data/game_log.csv"):
     plt.tight_layout()
     plt.savefig("data/events_plot.png")
     plt.show()
+
+def lttb(x, y, threshold):
+    # Largest-Triangle-Three-Buckets downsampling to `threshold` points. The
+    # first and last points are kept; from each bucket in between it keeps the
+    # point forming the largest triangle with the previously kept point and
+    # the mean of the next bucket, which preserves peaks and drops.
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return x, y
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    keep = np.zeros(threshold, dtype=np.int64)
+    keep[-1] = n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x, next_y = x[hi:edges[i + 2]].mean(), y[hi:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[n - 1], y[n - 1]
+        area = np.abs((x[a] - next_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (next_y - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return x[keep], y[keep]
+
+class MinMaxSeries:
+    # Bounded, shape-preserving summary of an unbounded series. Values are
+    # folded into buckets that keep their min and max; when the bucket count
+    # passes max_points, neighbouring buckets merge and the bucket width doubles.
+    def __init__(self, max_points=2000):
+        self.max_points = max_points
+        self.width = 1
+        self.count = 0
+        self.xs = np.zeros(0, dtype=np.int64)
+        self.mins = np.zeros(0)
+        self.maxs = np.zeros(0)
+        self._partial = np.zeros(0)
+
+    def add(self, values):
+        values = np.concatenate((self._partial, np.asarray(values, dtype=np.float64)))
+        full = len(values) // self.width * self.width
+        if full:
+            buckets = values[:full].reshape(-1, self.width)
+            start = self.count - len(self._partial)
+            self.xs = np.concatenate((self.xs, start + np.arange(0, full, self.width)))
+            self.mins = np.concatenate((self.mins, buckets.min(axis=1)))
+            self.maxs = np.concatenate((self.maxs, buckets.max(axis=1)))
+        self.count += len(values) - len(self._partial)
+        self._partial = values[full:]
+        while len(self.xs) > self.max_points:
+            self._merge()
+
+    def _merge(self):
+        even = len(self.xs) // 2 * 2
+        self.xs = np.concatenate((self.xs[:even:2], self.xs[even:]))
+        self.mins = np.concatenate((np.minimum(self.mins[:even:2], self.mins[1:even:2]), self.mins[even:]))
+        self.maxs = np.concatenate((np.maximum(self.maxs[:even:2], self.maxs[1:even:2]), self.maxs[even:]))
+        self.width *= 2
+
+    def points(self):
+        xs, mins, maxs = self.xs, self.mins, self.maxs
+        if len(self._partial):
+            xs = np.append(xs, self.count - len(self._partial))
+            mins = np.append(mins, self._partial.min())
+            maxs = np.append(maxs, self._partial.max())
+        return xs, mins, maxs
+
+class LogStats:
+    # Incremental aggregates over a game log read chunk by chunk. A new
+    # session starts after a 'hit' row or whenever the score goes down.
+    def __init__(self, max_points=2000):
+        self.rows = 0
+        self.event_counts = {}
+        self.score_series = MinMaxSeries(max_points)
+        self.sessions = []
+        self._last_score = None
+        self._last_event = None
+
+    def update(self, chunk):
+        self.rows += len(chunk)
+        for event, count in chunk['event'].value_counts().items():
+            if not count:  # categorical events list every type
+                continue
+            self.event_counts[event] = self.event_counts.get(event, 0) + int(count)
+        self.score_series.add(chunk.loc[chunk['event'] == 'missed', 'score'].to_numpy())
+
+        # Session boundaries, carrying the previous chunk's last row
+        prev_score = chunk['score'].shift(1, fill_value=self._last_score if self._last_score is not None else -1)
+        prev_event = chunk['event'].shift(1, fill_value=self._last_event)
+        starts = (chunk['score'] < prev_score) | (prev_event == 'hit')
+        if not self.sessions:
+            starts.iloc[0] = True
+        session_ids = starts.cumsum()
+
+        grouped = chunk.assign(session=session_ids, missed=chunk['event'] == 'missed').groupby('session', sort=True)
+        summary = grouped.agg(start=('timestamp', 'first'), end=('timestamp', 'last'),
+                              final_score=('score', 'max'), events=('event', 'size'), missed=('missed', 'sum'))
+        for session_id, row in summary.iterrows():
+            if session_id == 0:
+                # Continuation of the last open session
+                last = self.sessions[-1]
+                last['end'] = row['end']
+                last['final_score'] = max(last['final_score'], int(row['final_score']))
+                last['events'] += int(row['events'])
+                last['missed'] += int(row['missed'])
+            else:
+                self.sessions.append({'start': row['start'], 'end': row['end'],
+                                      'final_score': int(row['final_score']),
+                                      'events': int(row['events']), 'missed': int(row['missed'])})
+
+        self._last_score = chunk['score'].iloc[-1]
+        self._last_event = chunk['event'].iloc[-1]
+
+def binary_log_chunks(path, chunksize=1_000_000):
+    # Frames over slices of the mapped segments; nothing is parsed
+    for records in iter_segments(path):
+        for start in range(0, len(records), chunksize):
+            part = records[start:start + chunksize]
+            yield pd.DataFrame({'timestamp': pd.to_datetime(part['timestamp'], unit='us'),
+                                'event': event_names(part['event']),
+                                'score': part['score'].astype(np.int64)})
+
+def stream_game_log(filepath="data/game_log.csv", chunksize=1_000_000, max_points=2000):
+    stats = LogStats(max_points)
+    if is_binary_log(filepath):
+        chunks = binary_log_chunks(filepath, chunksize)
+    else:
+        chunks = pd.read_csv(filepath, chunksize=chunksize, usecols=['timestamp', 'event', 'score'],
+                             dtype={'event': 'str', 'score': 'int64'})
+    for chunk in chunks:
+        if len(chunk):
+            stats.update(chunk)
+    return stats
+
+def plot_log_stats(stats, output_dir="data"):
+    # Headless rendering; never blocks on a window
+    plt.switch_backend("Agg")
+    os.makedirs(output_dir, exist_ok=True)
+
+    xs, mins, maxs = stats.score_series.points()
+    plt.figure(figsize=(10, 5))
+    plt.plot(xs, maxs, label='Score over time', color='blue')
+    if stats.score_series.width > 1:
+        plt.fill_between(xs, mins, maxs, color='blue', alpha=0.3)
+    plt.title("Score Progression")
+    plt.xlabel("Time Step")
+    plt.ylabel("Score")
+    plt.grid(True)
+    plt.legend()
+    plt.tight_layout()
+    plt.savefig(os.path.join(output_dir, "score_plot.png"))
+    plt.close()
+
+    plt.figure()
+    pd.Series(stats.event_counts).sort_values(ascending=False).plot(kind='bar', color=['green', 'red'])
+    plt.title("Event Frequency")
+    plt.ylabel("Count")
+    plt.tight_layout()
+    plt.savefig(os.path.join(output_dir, "events_plot.png"))
+    plt.close()
+
+    pd.DataFrame(stats.sessions, columns=['start', 'end', 'final_score', 'events', 'missed']).to_csv(
+        os.path.join(output_dir, "session_summary.csv"), index=False)
+
+def report_log(filepath, output_dir, chunksize=1_000_000, max_points=2000):
+    # Charts and headline numbers for one log; runs in a worker process
+    stats = stream_game_log(filepath, chunksize, max_points)
+    plot_log_stats(stats, output_dir)
+    scores = [session['final_score'] for session in stats.sessions]
+    return {'log': filepath, 'output_dir': output_dir, 'rows': stats.rows, 'sessions': len(scores),
+            'best_score': max(scores, default=0), 'mean_score': float(np.mean(scores)) if scores else 0.0,
+            'events': stats.event_counts, 'error': None}
+
+def batch_report(filepaths, output_dir="data/reports", workers=None, chunksize=1_000_000, max_points=2000):
+    # Renders every log's charts in a pool of worker processes, each into
+    # its own subdirectory, then writes one report.html/report.csv over all
+    # of them. A log that fails to read gets an error row instead.
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = {}
+    for filepath in filepaths:
+        name = os.path.splitext(os.path.basename(os.path.normpath(filepath)))[0] or "log"
+        base, n = name, 1
+        while name in jobs:
+            n += 1
+            name = f"{base}_{n}"
+        jobs[name] = filepath
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(report_log, filepath, os.path.join(output_dir, name), chunksize, max_points): name
+                   for name, filepath in jobs.items()}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                results[name] = future.result()
+            except Exception as exc:
+                results[name] = {'log': jobs[name], 'output_dir': os.path.join(output_dir, name), 'rows': 0,
+                                 'sessions': 0, 'best_score': 0, 'mean_score': 0.0, 'events': {},
+                                 'error': f"{type(exc).__name__}: {exc}"}
+    ordered = [results[name] for name in jobs]
+    write_report(ordered, output_dir)
+    return ordered
+
+def write_report(results, output_dir):
+    rows = [{'log': r['log'], 'rows': r['rows'], 'sessions': r['sessions'], 'best_score': r['best_score'],
+             'mean_score': round(r['mean_score'], 1),
+             'events': " ".join(f"{event}={count}" for event, count in sorted(r['events'].items())),
+             'error': r['error'] or ""} for r in results]
+    pd.DataFrame(rows, columns=['log', 'rows', 'sessions', 'best_score', 'mean_score', 'events', 'error']).to_csv(
+        os.path.join(output_dir, "report.csv"), index=False)
+
+    sections = []
+    for r, row in zip(results, rows):
+        charts = os.path.relpath(r['output_dir'], output_dir)
+        if r['error']:
+            body = f"<p class='error'>{html.escape(r['error'])}</p>"
+        else:
+            body = (f"<p>{row['rows']} rows, {row['sessions']} sessions, best score {row['best_score']}, "
+                    f"mean score {row['mean_score']}<br>{html.escape(row['events'])}</p>"
+                    f"<img src='{charts}/score_plot.png' width='600'> "
+                    f"<img src='{charts}/events_plot.png' width='400'> "
+                    f"<p><a href='{charts}/session_summary.csv'>sessions</a></p>")
+        sections.append(f"<h2>{html.escape(r['log'])}</h2>{body}")
+    with open(os.path.join(output_dir, "report.html"), "w") as file:
+        file.write("<!DOCTYPE html><html><head><meta charset='utf-8'><title>DodgeMaster++ log report</title>"
+                   "<style>body{font-family:sans-serif} .error{color:#c00}</style></head><body>"
+                   f"<h1>DodgeMaster++ log report ({len(results)} logs)</h1>" + "".join(sections) + "</body></html>")
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Analyze a DodgeMaster++ game log")
+    parser.add_argument("filepaths", nargs="*", default=[LOG_DIR if os.path.isdir(LOG_DIR) else "data/game_log.csv"],
+                        help="binary log directories or segments (binlog.py), or CSV logs")
+    parser.add_argument("--stream", action="store_true", help="read the log in chunks and render headless")
+    parser.add_argument("--chunksize", type=int, default=1_000_000)
+    parser.add_argument("--output-dir", help="where charts are written (default: data, or data/reports with --report)")
+    parser.add_argument("--report", action="store_true",
+                        help="render every log headless in parallel and write OUTPUT_DIR/report.html")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes for --report (default: one per CPU)")
+    parser.add_argument("--max-points", type=int, default=2000, help="points per plotted score series")
+    args = parser.parse_args()
+
+    if args.report:
+        output_dir = args.output_dir or os.path.join("data", "reports")
+        results = batch_report(args.filepaths, output_dir, args.workers, args.chunksize, args.max_points)
+        failed = [r for r in results if r['error']]
+        for r in failed:
+            print(f"{r['log']}: {r['error']}")
+        print(f"{len(results) - len(failed)} of {len(results)} logs reported in {os.path.join(output_dir, 'report.html')}")
+        sys.exit(1 if failed else 0)
+    if len(args.filepaths) > 1:
+        parser.error("more than one log needs --report")
+    filepath = args.filepaths[0]
+    if args.stream:
+        stats = stream_game_log(filepath, args.chunksize, args.max_points)
+        plot_log_stats(stats, args.output_dir or "data")
+        print(f"rows={stats.rows} sessions={len(stats.sessions)} events={stats.event_counts}")
+    else:
+        analyze_game_log(filepath, max_points=args.max_points)